@@ -0,0 +1,329 @@
+import asyncio
+import copy
+import json
+import random
+import re
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from beanie import init_beanie
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+_URN_RE = re.compile(r"^URN: (\S+)", re.MULTILINE)
+
+
+# --- Fake LLM ---
+class FakeRateLimitError(Exception):
+    code = 429
+
+
+class FakeChatModel:
+    """
+    Stand-in for ChatGoogleGenerativeAI with a configurable latency.
+
+    Answers the prompts the agent sends: batched comment requests get a JSON
+    list back, single posts a comment (or [SKIP] for one in `skip_every`),
+    anything else a short bullet-point summary. Counts every call.
+    `error_rate` of the calls fail with a 429 and `stall_rate` hang for
+    `stall_seconds`, to exercise the LLM gateway's retries and deadlines.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        skip_every: int = 4,
+        model: str = "fake-chat",
+        temperature: float = 0.7,
+        seed: int = 42,
+        error_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        stall_seconds: float = 300.0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.skip_every = skip_every
+        self.model = model
+        self.temperature = temperature
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self._rng = random.Random(seed)
+        self._answered = 0
+        self.calls = 0
+        self.errors = 0
+        self.stalls = 0
+        self.prompt_chars = 0
+
+    async def ainvoke(self, prompt, **kwargs) -> AIMessage:
+        text = self._prompt_text(prompt)
+        self.calls += 1
+        self.prompt_chars += len(text)
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return AIMessage(content=self._respond(text))
+
+    async def astream(self, prompt, **kwargs):
+        text = self._prompt_text(prompt)
+        self.calls += 1
+        self.prompt_chars += len(text)
+        words = self._respond(text).split(" ")
+        # Time to first token, then the rest trickles in
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        for i, word in enumerate(words):
+            yield AIMessageChunk(content=word if i == 0 else f" {word}")
+            await asyncio.sleep(0)
+
+    def _delay(self) -> float:
+        if self.stall_rate and self._rng.random() < self.stall_rate:
+            self.stalls += 1
+            return self.stall_seconds
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _maybe_fail(self):
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise FakeRateLimitError("429 RESOURCE_EXHAUSTED: fake quota exceeded")
+
+    @staticmethod
+    def _prompt_text(prompt) -> str:
+        if isinstance(prompt, str):
+            return prompt
+        return "\n".join(getattr(m, "content", str(m)) for m in prompt)
+
+    def _comment(self) -> str:
+        self._answered += 1
+        if self.skip_every and self._answered % self.skip_every == 0:
+            return "[SKIP]"
+        return "Great points here. The part about measuring twice really resonates with what we've seen."
+
+    def _respond(self, text: str) -> str:
+        if "--- POSTS ---" in text and "URN: " in text:
+            return json.dumps([{"urn": urn, "comment": self._comment()} for urn in _URN_RE.findall(text)])
+        if "--- POST ---" in text:
+            return self._comment()
+        return "- Engineering practice\n- Hiring and careers\n- AI tooling\n- Cloud costs"
+
+
+# --- In-memory Beanie backend ---
+def _get(doc: Dict[str, Any], path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _match_value(value, condition) -> bool:
+    if not isinstance(condition, dict) or not any(k.startswith("$") for k in condition):
+        return value == condition
+    for op, arg in condition.items():
+        if op == "$in" and value not in arg:
+            return False
+        if op == "$nin" and value in arg:
+            return False
+        if op == "$ne" and value == arg:
+            return False
+        if op == "$exists" and (value is not None) != bool(arg):
+            return False
+        if op == "$type" and arg == "string" and not isinstance(value, str):
+            return False
+        if op in ("$gt", "$gte", "$lt", "$lte"):
+            if value is None:
+                return False
+            if op == "$gt" and not value > arg:
+                return False
+            if op == "$gte" and not value >= arg:
+                return False
+            if op == "$lt" and not value < arg:
+                return False
+            if op == "$lte" and not value <= arg:
+                return False
+    return True
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Evaluates the subset of MongoDB query syntax the app's queries use."""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif not _match_value(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    fields = {k for k, v in projection.items() if v}
+    return {k: copy.deepcopy(v) for k, v in doc.items() if k in fields or k == "_id"}
+
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any]):
+    for key, value in update.get("$set", {}).items():
+        doc[key] = value
+    for key, value in update.get("$inc", {}).items():
+        doc[key] = (doc.get(key) or 0) + value
+    for key, value in update.get("$setOnInsert", {}).items():
+        doc.setdefault(key, value)
+
+
+class InMemoryCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs, self._docs = self._docs[:length], self._docs[length:] if length else []
+        return docs
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class InMemoryCollection:
+    """The pymongo AsyncCollection calls Beanie makes, over a list of dicts (no indexes)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: List[Dict[str, Any]] = []
+        self.calls = 0
+
+    def find(self, filter=None, sort=None, projection=None, skip=0, limit=0, **kwargs) -> InMemoryCursor:
+        self.calls += 1
+        docs = [d for d in self.docs if matches(d, filter)]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda d: (_get(d, key) is not None, _get(d, key)), reverse=direction < 0)
+        docs = docs[skip or 0:]
+        if limit:
+            docs = docs[:limit]
+        return InMemoryCursor([_project(d, projection) for d in docs])
+
+    async def find_one(self, filter=None, projection=None, **kwargs) -> Optional[Dict[str, Any]]:
+        docs = await self.find(filter, projection=projection, limit=1).to_list()
+        return docs[0] if docs else None
+
+    async def count_documents(self, filter=None, **kwargs) -> int:
+        self.calls += 1
+        return sum(1 for d in self.docs if matches(d, filter))
+
+    async def insert_one(self, document: Dict[str, Any], **kwargs):
+        self.calls += 1
+        doc = self._stored(document)
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"], acknowledged=True)
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True, **kwargs):
+        self.calls += 1
+        stored = [self._stored(d) for d in documents]
+        self.docs.extend(stored)
+        return SimpleNamespace(inserted_ids=[d["_id"] for d in stored], acknowledged=True)
+
+    async def replace_one(self, filter, replacement: Dict[str, Any], upsert: bool = False, **kwargs):
+        self.calls += 1
+        for i, doc in enumerate(self.docs):
+            if matches(doc, filter):
+                self.docs[i] = {**copy.deepcopy(replacement), "_id": doc["_id"]}
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = self._stored(replacement)
+            self.docs.append(doc)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def update_one(self, filter, update: Dict[str, Any], upsert: bool = False, **kwargs):
+        return await self._update(filter, update, upsert, many=False)
+
+    async def update_many(self, filter, update: Dict[str, Any], upsert: bool = False, **kwargs):
+        return await self._update(filter, update, upsert, many=True)
+
+    async def find_one_and_update(self, filter, update: Dict[str, Any], upsert: bool = False, return_document=ReturnDocument.BEFORE, **kwargs):
+        before = await self.find_one(filter)
+        await self._update(filter, update, upsert, many=False)
+        if return_document == ReturnDocument.BEFORE:
+            return before
+        return await self.find_one({"_id": before["_id"]} if before else filter)
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs):
+        for request in requests:
+            # Only the UpdateOne upserts the app sends
+            await self._update(request._filter, request._doc, request._upsert, many=False)
+        return SimpleNamespace(acknowledged=True)
+
+    async def delete_many(self, filter=None, **kwargs):
+        self.calls += 1
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, filter)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def delete_one(self, filter=None, **kwargs):
+        self.calls += 1
+        for i, doc in enumerate(self.docs):
+            if matches(doc, filter):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def _update(self, filter, update: Dict[str, Any], upsert: bool, many: bool):
+        self.calls += 1
+        matched = 0
+        for doc in self.docs:
+            if matches(doc, filter):
+                _apply_update(doc, update)
+                matched += 1
+                if not many:
+                    break
+        upserted_id = None
+        if not matched and upsert:
+            doc = self._stored({k: v for k, v in (filter or {}).items() if not k.startswith("$")})
+            _apply_update(doc, update)
+            self.docs.append(doc)
+            upserted_id = doc["_id"]
+        return SimpleNamespace(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    @staticmethod
+    def _stored(document: Dict[str, Any]) -> Dict[str, Any]:
+        doc = copy.deepcopy(document)
+        if doc.get("_id") is None:
+            doc["_id"] = ObjectId()
+        return doc
+
+
+class InMemoryDatabase:
+    """Just enough of a pymongo AsyncDatabase for init_beanie(skip_indexes=True)."""
+
+    def __init__(self):
+        self.collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = InMemoryCollection(name)
+        return self.collections[name]
+
+    async def command(self, command: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        if "buildInfo" in command:
+            return {"version": "7.0.0"}
+        return {"ok": 1}
+
+    def calls(self) -> int:
+        return sum(c.calls for c in self.collections.values())
+
+
+async def init_in_memory_db() -> InMemoryDatabase:
+    """Initializes every app model against a fresh in-memory database."""
+    from config.database import DOCUMENT_MODELS
+
+    database = InMemoryDatabase()
+    await init_beanie(database=database, document_models=DOCUMENT_MODELS, skip_indexes=True)
+    return database
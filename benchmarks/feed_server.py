@@ -0,0 +1,240 @@
+import json
+import random
+import threading
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+# Markup mirrors the SelectorConfig defaults, so the automator runs unchanged against it
+POST_TEMPLATE = """
+<div class="feed-shared-update-v2" data-urn="{urn}">
+  <div class="update-components-actor__single-line-truncate"><span aria-hidden="true">{author}</span></div>
+  <div class="update-components-update-v2__commentary">{content}</div>
+  <img class="update-components-image" src="/feed/media?urn={urn}" width="552" height="300" alt="">
+  <button class="react-button__trigger" onclick="act('like', '{urn}')">Like</button>
+  <button class="comment-button" onclick="openComments(this)">Comment</button>
+  <div class="comments-box" hidden>
+    <div class="ql-editor" contenteditable="true"></div>
+    <button class="comments-comment-box__submit-button--cr" onclick="act('comment', '{urn}', this)">Post</button>
+  </div>
+</div>
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Feed | LinkedIn</title>
+<style>
+  .feed-shared-update-v2 {{ min-height: 320px; border-bottom: 1px solid #ddd; padding: 16px; }}
+</style>
+</head>
+<body>
+<main id="feed">{posts}</main>
+<script>
+  let offset = {offset};
+  let loading = false;
+  const total = {total};
+
+  // LinkedIn-style infinite scroll: the next page is fetched when the user nears the bottom
+  async function loadMore() {{
+    if (loading || offset >= total) return;
+    loading = true;
+    const res = await fetch(`/feed/posts?offset=${{offset}}`);
+    const page = await res.json();
+    await new Promise((r) => setTimeout(r, {delay_ms}));
+    document.getElementById("feed").insertAdjacentHTML("beforeend", page.html);
+    offset = page.next_offset;
+    loading = false;
+  }}
+  window.addEventListener("scroll", () => {{
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 2 * window.innerHeight) loadMore();
+  }});
+
+  function openComments(button) {{
+    button.parentElement.querySelector(".comments-box").hidden = false;
+  }}
+  function act(type, urn, button) {{
+    const text = button ? button.parentElement.querySelector(".ql-editor").textContent : null;
+    fetch("/feed/actions", {{ method: "POST", body: JSON.stringify({{ type: type, urn: urn, text: text }}) }});
+  }}
+</script>
+</body>
+</html>
+"""
+
+_TOPICS = [
+    "platform engineering", "hiring pipelines", "LLM evaluation", "remote work", "cloud costs",
+    "product discovery", "incident reviews", "data contracts", "career growth", "open source funding",
+]
+_SHORT_POSTS = [
+    "We're hiring! DM me.", "Happy work anniversary to me!", "Thrilled to announce I've started a new position!",
+    "Congrats to the whole team!", "Link in comments.",
+]
+_TEAMS = ["our payments team", "a small startup", "the data platform group", "my previous company", "a public sector client", "our mobile squad"]
+_PRACTICES = ["weekly demos", "written design reviews", "error budgets", "pairing rotations", "shadow on-call", "quarterly planning", "feature flags", "blameless postmortems"]
+_OUTCOMES = ["fewer escalations", "faster onboarding", "lower spend", "calmer releases", "clearer ownership", "happier customers"]
+_CLOSERS = [
+    "Curious how others handle this.", "What would you add?", "Happy to share the template.",
+    "Still figuring out the rest.", "Would love to hear counterexamples.",
+]
+
+
+def _long_post(rng: random.Random) -> str:
+    topic, team = rng.choice(_TOPICS), rng.choice(_TEAMS)
+    practices = rng.sample(_PRACTICES, 3)
+    sentences = [
+        f"Lessons learned from {rng.randint(2, 18)} months of {topic} at {team}.",
+        f"We started with {practices[0]} and added {practices[1]} once the first {rng.randint(3, 40)} incidents showed the gaps.",
+        f"The biggest surprise was how much {topic} depends on {practices[2]} rather than tooling.",
+        f"Result: {rng.choice(_OUTCOMES)} and {rng.choice(_OUTCOMES)}, measured over {rng.randint(2, 12)} quarters.",
+        f"If you are starting with {topic} today, begin with {rng.choice(_PRACTICES)} and write down every assumption.",
+    ]
+    rng.shuffle(sentences)
+    return " ".join(sentences[:rng.randint(3, 5)] + [rng.choice(_CLOSERS)])
+
+
+def synthetic_posts(count: int, seed: int = 42, reshare_rate: float = 0.1) -> List[Dict[str, str]]:
+    """
+    Deterministic feed: mostly long-form posts, some low-value ones for the
+    pre-filter and some reshares of earlier posts for near-duplicate detection.
+    """
+    rng = random.Random(seed)
+    posts = []
+    originals = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.2:
+            content = rng.choice(_SHORT_POSTS)
+        elif roll < 0.2 + reshare_rate and originals:
+            content = f"{rng.choice(['Reposting this:', 'Worth a read.', 'So true!'])} {rng.choice(originals)}"
+        else:
+            content = _long_post(rng)
+            originals.append(content)
+        posts.append({
+            "urn": f"urn:li:activity:{7000000000000000000 + i}",
+            "author": f"Author {i % 37}",
+            "content": content,
+        })
+    return posts
+
+
+def load_recorded_posts(path: str) -> List[Dict[str, str]]:
+    """Loads a recorded feed: a JSON list of {"author", "content"} objects ("urn" optional)."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    return [{
+        "urn": r.get("urn") or f"urn:li:activity:{7100000000000000000 + i}",
+        "author": r["author"],
+        "content": r["content"],
+    } for i, r in enumerate(records)]
+
+
+class FeedServer:
+    """
+    Local stand-in for the LinkedIn feed.
+
+    Serves `posts` at /feed/, `page_size` at a time: the first page is in the
+    HTML, the rest are fetched by an infinite-scroll handler (after `delay_ms`,
+    to imitate network latency). Every post carries a `media_kb` image, so
+    resource blocking shows up in the bytes received. Likes and posted
+    comments are recorded in `actions` instead of going anywhere.
+    """
+
+    def __init__(self, posts: List[Dict[str, str]], page_size: int = 5, delay_ms: int = 300, media_kb: int = 80, port: int = 0):
+        self.posts = posts
+        self.page_size = max(1, page_size)
+        self.delay_ms = delay_ms
+        self.media = bytes(media_kb * 1024)
+        self.media_requests = 0
+        self.actions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/feed/"
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    def start(self) -> "FeedServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def render_posts(self, offset: int) -> str:
+        return "".join(
+            POST_TEMPLATE.format(urn=escape(p["urn"]), author=escape(p["author"]), content=escape(p["content"]))
+            for p in self.posts[offset:offset + self.page_size]
+        )
+
+    def render_page(self) -> str:
+        return PAGE_TEMPLATE.format(
+            posts=self.render_posts(0),
+            offset=min(self.page_size, len(self.posts)),
+            total=len(self.posts),
+            delay_ms=self.delay_ms,
+        )
+
+    def record_action(self, action: Dict[str, Any]):
+        with self._lock:
+            self.actions.append(action)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path in ("/feed", "/feed/"):
+                    self._send(200, "text/html", server.render_page())
+                elif url.path == "/feed/posts":
+                    offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+                    page = {
+                        "html": server.render_posts(offset),
+                        "next_offset": min(offset + server.page_size, len(server.posts)),
+                    }
+                    self._send(200, "application/json", json.dumps(page))
+                elif url.path == "/feed/media":
+                    with server._lock:
+                        server.media_requests += 1
+                    self._send_bytes(200, "image/jpeg", server.media)
+                else:
+                    self._send(404, "text/plain", "Not found")
+
+            def do_POST(self):
+                if urlparse(self.path).path != "/feed/actions":
+                    self._send(404, "text/plain", "Not found")
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                server.record_action(json.loads(self.rfile.read(length) or b"{}"))
+                self._send(204, "text/plain", "")
+
+            def _send(self, status: int, content_type: str, body: str):
+                self._send_bytes(status, f"{content_type}; charset=utf-8", body.encode("utf-8"))
+
+            def _send_bytes(self, status: int, content_type: str, data: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass # Keep benchmark output readable
+
+        return Handler
@@ -0,0 +1,319 @@
+"""
+End-to-end benchmarks against a local feed, a fake LLM and an in-memory database.
+
+    python -m benchmarks.run --posts 40 --llm-latency 0.5 --json baseline.json
+
+Scenarios:
+  scrape    LinkedInAutomator.scroll_and_scrape_posts on the replayed feed
+  actions   LinkedInAutomator.perform_actions (like + comment) on every scraped post
+  workflow  the full get_workflow() graph, through run_linkedin_agent
+
+Per-post latency is the time between consecutive posts coming out of the
+stage (scraped, acted on, or fully handled by the workflow). The action
+pacer runs with the "off" profile unless --pacing is given, so the numbers
+measure the machinery rather than the deliberate pauses.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List, Dict, Any, Optional
+
+# The app's settings are required at import time; none of them reach a real service here
+for _name, _value in {
+    "GEMINI_API_KEY": "benchmark",
+    "MONGO_DB_URL": "mongodb://localhost:27017",
+    "MONGO_DB_NAME": "benchmark",
+    "USER_VOICE_PROMPT": "Friendly, curious and concise.",
+    "ADMIN_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from benchmarks.feed_server import FeedServer, synthetic_posts, load_recorded_posts
+from benchmarks.fakes import FakeChatModel, init_in_memory_db
+
+SCENARIOS = ["scrape", "actions", "workflow"]
+
+
+# --- Helpers ---
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Timeline:
+    """Per-post completion times of one stage."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: List[float] = []
+
+    def mark(self, count: int = 1):
+        now = time.perf_counter()
+        previous = self.marks[-1] if self.marks else self.started
+        # A batch of posts arriving together shares the interval evenly
+        step = (now - previous) / max(1, count)
+        self.marks.extend(previous + step * (i + 1) for i in range(count))
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        points = [self.started] + self.marks
+        latencies = [(b - a) * 1000 for a, b in zip(points, points[1:])]
+        p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+        return {
+            "posts": len(self.marks),
+            "seconds": round(elapsed, 3),
+            "posts_per_sec": round(len(self.marks) / elapsed, 3) if elapsed else None,
+            "p50_ms": round(p50, 1) if p50 is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+        }
+
+
+class RssSampler:
+    """Samples the browser process tree's RSS in the background and keeps the peak."""
+
+    def __init__(self, pool, interval: float = 0.25):
+        self.pool = pool
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._sample()
+        self._task.cancel()
+
+    def _sample(self):
+        rss = self.pool.stats()["rss_mb"]
+        if rss is not None:
+            self.peak_mb = max(self.peak_mb or 0.0, rss)
+
+    async def _run(self):
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+
+class _DashboardSocket:
+    """Fake dashboard connection that timestamps the events of a run."""
+
+    def __init__(self, on_event):
+        self.on_event = on_event
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.on_event(data)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def cookie_json(server: FeedServer) -> str:
+    return json.dumps([{"name": "li_at", "value": "benchmark", "domain": server.host, "path": "/"}])
+
+
+# --- Scenarios ---
+async def bench_scrape_and_actions(server: FeedServer, args, scenarios: List[str]) -> Dict[str, Any]:
+    from utils.automation import LinkedInAutomator
+    from utils.browser_pool import browser_pool
+
+    results = {}
+    automator = LinkedInAutomator(cookie_json(server), auto_like=True, auto_comment=True)
+    async with automator:
+        await automator.go_to_feed()
+
+        with RssSampler(browser_pool) as rss:
+            timeline = Timeline()
+            posts = []
+            # Same loop scroll_and_scrape_posts runs, observed batch by batch
+            async for batch in automator.iter_post_batches(args.posts):
+                posts.extend(batch)
+                timeline.mark(len(batch))
+        results["scrape"] = {
+            **timeline.report(),
+            "scrolls": len(automator.scroll_timings),
+            "network": automator.network.as_dict(),
+            "media_requests": server.media_requests,
+            "llm_calls_per_post": 0.0,
+            "rss_peak_mb": rss.peak_mb,
+        }
+
+        if "actions" in scenarios:
+            actions_before = len(server.actions)
+            with RssSampler(browser_pool) as rss:
+                timeline = Timeline()
+                for post in posts:
+                    await automator.perform_actions(post, "Benchmark comment.")
+                    timeline.mark()
+            results["actions"] = {
+                **timeline.report(),
+                "actions_recorded": len(server.actions) - actions_before,
+                "llm_calls_per_post": 0.0,
+                "rss_peak_mb": rss.peak_mb,
+            }
+    return results
+
+
+async def bench_workflow(server: FeedServer, args, database) -> Dict[str, Any]:
+    from utils.llm_gateway import llm_gateway
+    from controllers.agent_controller import run_linkedin_agent
+    from models.api_models import AgentStartRequest
+    from utils.browser_pool import browser_pool
+    from utils.connection_manager import manager
+
+    fake_llm = FakeChatModel(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        error_rate=args.llm_error_rate,
+        stall_rate=args.llm_stall_rate
+    )
+    # The app's own gateway stays in front of the fake, so retries and deadlines are measured too
+    llm_gateway.llm = fake_llm
+    run_id = "benchmark-workflow"
+    timeline = Timeline()
+
+    def on_event(event: Dict[str, Any]):
+        # A post is done once it's acted on or the model skipped it
+        message = event.get("message") or ""
+        if event.get("type") == "result" or (event.get("type") == "log" and "(not insightful)" in message):
+            timeline.mark()
+
+    socket = _DashboardSocket(on_event)
+    await manager.connect(socket, run_id=run_id)
+    db_calls_before = database.calls()
+    try:
+        with RssSampler(browser_pool) as rss:
+            request = AgentStartRequest(
+                auto_comment=True,
+                auto_like=True,
+                max_posts_to_process=args.posts,
+                cookie_json=cookie_json(server)
+            )
+            final_state = await run_linkedin_agent(request, run_id=run_id)
+    finally:
+        manager.disconnect(socket)
+
+    if final_state.get("error"):
+        raise RuntimeError(f"Workflow failed: {final_state['error']}")
+
+    run_stats = final_state.get("run_stats", {})
+    scraped = run_stats.get("posts_scraped", 0)
+    report = timeline.report()
+    return {
+        **report,
+        # Throughput over every scraped post, including the ones filtered before the LLM
+        "posts_scraped": scraped,
+        "scraped_per_sec": round(scraped / report["seconds"], 3) if report["seconds"] else None,
+        "llm_calls": fake_llm.calls,
+        "llm_errors_injected": fake_llm.errors,
+        "llm_stalls_injected": fake_llm.stalls,
+        "llm_calls_per_post": round(fake_llm.calls / scraped, 3) if scraped else None,
+        "db_calls": database.calls() - db_calls_before,
+        "network": run_stats.get("network"),
+        "rss_peak_mb": rss.peak_mb,
+    }
+
+
+# --- Runner ---
+async def run(args) -> Dict[str, Any]:
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    posts = load_recorded_posts(args.feed_file) if args.feed_file else synthetic_posts(args.posts)
+    server = FeedServer(posts, page_size=args.page_size, delay_ms=args.feed_delay_ms).start()
+    os.environ["LINKEDIN_FEED_URL"] = server.url
+    if args.no_blocking:
+        os.environ["BLOCK_RESOURCE_TYPES"] = ""
+        os.environ["BLOCK_HOSTS"] = ""
+    if not args.pacing:
+        os.environ["PACING_PROFILE"] = "off"
+
+    # Imported only now: settings are read at import time
+    from utils.browser_pool import browser_pool
+
+    database = await init_in_memory_db()
+
+    results: Dict[str, Any] = {
+        "config": {
+            "feed_posts": len(posts),
+            "max_posts": args.posts,
+            "page_size": args.page_size,
+            "feed_delay_ms": args.feed_delay_ms,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "llm_stall_rate": args.llm_stall_rate,
+            "pacing": args.pacing,
+            "resource_blocking": not args.no_blocking,
+        }
+    }
+    try:
+        await browser_pool.start()
+        results["browser_launch"] = {"launches": browser_pool.launches}
+        if "scrape" in scenarios or "actions" in scenarios:
+            results.update(await bench_scrape_and_actions(server, args, scenarios))
+            if "scrape" not in scenarios:
+                results.pop("scrape", None)
+        if "workflow" in scenarios:
+            results["workflow"] = await bench_workflow(server, args, database)
+    finally:
+        await browser_pool.close()
+        server.stop()
+    return results
+
+
+def print_report(results: Dict[str, Any]):
+    columns = ["posts", "seconds", "posts_per_sec", "p50_ms", "p95_ms", "llm_calls_per_post", "rss_peak_mb"]
+    print()
+    print(f"{'scenario':<10}" + "".join(f"{c:>20}" for c in columns))
+    for name in SCENARIOS:
+        if name not in results:
+            continue
+        row = results[name]
+        cells = []
+        for c in columns:
+            value = row.get(c)
+            cells.append(f"{value:>20.2f}" if isinstance(value, float) else f"{str(value):>20}")
+        print(f"{name:<10}" + "".join(cells))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks for the LinkedIn agent.")
+    parser.add_argument("--posts", type=int, default=40, help="Posts to scrape / process per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated: scrape,actions,workflow")
+    parser.add_argument("--feed-file", help="Recorded feed (JSON list of {author, content}); synthetic if omitted")
+    parser.add_argument("--page-size", type=int, default=5, help="Posts per lazy-loaded feed page")
+    parser.add_argument("--feed-delay-ms", type=int, default=300, help="Simulated latency of each feed page")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per fake LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="+/- seconds of random LLM latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Share of fake LLM calls failing with a 429")
+    parser.add_argument("--llm-stall-rate", type=float, default=0.0, help="Share of fake LLM calls that hang (cut off by LLM_TIMEOUT_SECONDS)")
+    parser.add_argument("--pacing", action="store_true", help="Pace likes/comments with the configured PACING_PROFILE")
+    parser.add_argument("--no-blocking", action="store_true", help="Load every resource (baseline for the resource policy)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
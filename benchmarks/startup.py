@@ -0,0 +1,143 @@
+"""
+Cold-start benchmark for the API process.
+
+    python -m benchmarks.startup --runs 5 --max-import-seconds 1.5
+
+Every run is a fresh interpreter, like a new uvicorn worker or container:
+it imports `main`, then goes through the app's lifespan startup against an
+in-memory database (the background warm-up is turned off, it doesn't delay
+serving). Reports the median and worst times and the packages that cost
+the most to import.
+
+Exits with status 1 when the median import time is over the budget, or when
+importing `main` already loads the agent stack (LangGraph, LangChain, the
+Gemini SDK, Playwright), which must only load on the first run or in the
+warm-up. Meant to run in CI or as a step of the Docker build.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from typing import List, Dict, Any
+
+# Modules that have no business being imported before the first agent run
+LAZY_MODULES = ["langgraph", "langchain_core", "langchain_google_genai", "google.ai.generativelanguage", "playwright", "utils.workflow"]
+
+_PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+loaded = [m for m in {lazy!r} if m in sys.modules]
+
+from benchmarks.fakes import init_in_memory_db
+
+async def startup():
+    main.init_db = init_in_memory_db # The lifespan looks init_db up in main
+    begin = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter() - begin
+
+ready = asyncio.run(startup())
+print(json.dumps({{"import_s": imported - started, "startup_s": ready, "lazy_loaded": loaded}}))
+"""
+
+
+def probe_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # The app's settings are required at import time; none of them reach a real service here
+    for name, value in {
+        "GEMINI_API_KEY": "benchmark",
+        "MONGO_DB_URL": "mongodb://localhost:27017",
+        "MONGO_DB_NAME": "benchmark",
+        "USER_VOICE_PROMPT": "Friendly, curious and concise.",
+        "ADMIN_API_KEY": "benchmark",
+    }.items():
+        env.setdefault(name, value)
+    env["AGENT_WARM_UP"] = "false"
+    return env
+
+
+def import_costs(stderr: str) -> Counter:
+    """Self time (seconds) per top-level package, from -X importtime output."""
+    costs: Counter = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        costs[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return costs
+
+
+def run_once(root: str) -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(lazy=LAZY_MODULES)],
+        cwd=root,
+        env=probe_env(),
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{proc.stdout}\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["costs"] = import_costs(proc.stderr)
+    return result
+
+
+def summarize(runs: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    costs: Counter = Counter()
+    for r in runs:
+        costs.update(r["costs"])
+    return {
+        "runs": len(runs),
+        "import_median_s": round(statistics.median(r["import_s"] for r in runs), 3),
+        "import_max_s": round(max(r["import_s"] for r in runs), 3),
+        "startup_median_s": round(statistics.median(r["startup_s"] for r in runs), 3),
+        "startup_max_s": round(max(r["startup_s"] for r in runs), 3),
+        "lazy_loaded": sorted({m for r in runs for m in r["lazy_loaded"]}),
+        "slowest_packages": {name: round(total / len(runs), 3) for name, total in costs.most_common(top)},
+    }
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"import main   median {results['import_median_s']:.3f}s   max {results['import_max_s']:.3f}s")
+    print(f"app startup   median {results['startup_median_s']:.3f}s   max {results['startup_max_s']:.3f}s")
+    print("slowest packages (self import time):")
+    for name, seconds in results["slowest_packages"].items():
+        print(f"  {name:<30}{seconds:>8.3f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the API process.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--max-import-seconds", type=float, default=1.5, help="Budget for the median `import main` (0 disables)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list")
+    parser.add_argument("--json", help="Also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = summarize([run_once(root) for _ in range(max(1, args.runs))], args.top)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    failures = []
+    if results["lazy_loaded"]:
+        failures.append(f"`import main` loads modules that should load lazily: {', '.join(results['lazy_loaded'])}")
+    if args.max_import_seconds and results["import_median_s"] > args.max_import_seconds:
+        failures.append(f"`import main` took {results['import_median_s']:.3f}s (budget {args.max_import_seconds:.3f}s)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
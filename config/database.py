@@ -3,15 +3,31 @@ from beanie import init_beanie
 from config.settings import settings
 from models.comment_log import CommentLog
 from models.selectors import SelectorConfig # <-- ADDED
+from models.comment_cache import CachedComment
+from models.agent_job import AgentJob
+from models.session_state import SessionState
+from models.run_checkpoint import RunCheckpoint
+from models.daily_rollup import DailyRollup
+from models.post_fingerprint import PostFingerprint
+
+DOCUMENT_MODELS = [
+    CommentLog,
+    CachedComment,
+    AgentJob,
+    SessionState,
+    RunCheckpoint,
+    DailyRollup,
+    PostFingerprint,
+    SelectorConfig  # <-- ADDED
+]
 
 async def init_db():
     client = AsyncIOMotorClient(settings.MONGO_DB_URL)
     
     await init_beanie(
         database=client[settings.MONGO_DB_NAME],
-        document_models=[
-            CommentLog,
-            SelectorConfig  # <-- ADDED
-        ]
+        document_models=DOCUMENT_MODELS,
+        # Drops indexes no model declares anymore (e.g. the old post_content index)
+        allow_index_dropping=True
     )
     print("Database initialized...")
\ No newline at end of file
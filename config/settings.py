@@ -7,6 +7,98 @@ class Settings(BaseSettings):
     MONGO_DB_NAME: str = Field(..., env="MONGO_DB_NAME")
     USER_VOICE_PROMPT: str = Field(..., env="USER_VOICE_PROMPT")
     ADMIN_API_KEY: str = Field(..., env="ADMIN_API_KEY") # <-- ADDED
+
+    # --- Startup ---
+    AGENT_WARM_UP: bool = Field(default=True, env="AGENT_WARM_UP") # Load the agent stack and launch the browsers in the background after startup
+
+    # --- Browser Pool ---
+    BROWSER_POOL_SIZE: int = Field(default=1, env="BROWSER_POOL_SIZE")
+    BROWSER_MAX_CONTEXTS: int = Field(default=50, env="BROWSER_MAX_CONTEXTS") # Recycle a browser after this many runs
+    BROWSER_MAX_MEMORY_MB: int = Field(default=1500, env="BROWSER_MAX_MEMORY_MB") # 0 disables the memory check
+    BROWSER_HEALTH_CHECK_INTERVAL: float = Field(default=30.0, env="BROWSER_HEALTH_CHECK_INTERVAL")
+
+    # --- Session Snapshots ---
+    SESSION_STATE_ENABLED: bool = Field(default=True, env="SESSION_STATE_ENABLED") # Restore each account's last storage_state
+    SESSION_STATE_KEY: str = Field(default="", env="SESSION_STATE_KEY") # Fernet key; derived from ADMIN_API_KEY when empty
+    SESSION_STATE_MAX_AGE_DAYS: int = Field(default=14, env="SESSION_STATE_MAX_AGE_DAYS")
+
+    # --- Action Pacing ---
+    PACING_PROFILE: str = Field(default="normal", env="PACING_PROFILE") # cautious | normal | fast (off: no limits, testing only)
+
+    # --- Job Scheduler ---
+    MAX_CONCURRENT_RUNS: int = Field(default=2, env="MAX_CONCURRENT_RUNS") # Browser runs at once, across all accounts
+    MAX_RUNS_PER_ACCOUNT: int = Field(default=1, env="MAX_RUNS_PER_ACCOUNT")
+    MAX_QUEUED_JOBS: int = Field(default=100, env="MAX_QUEUED_JOBS") # /agent/start answers 503 beyond this
+    JOB_TIMEOUT_SECONDS: float = Field(default=3600, env="JOB_TIMEOUT_SECONDS")
+
+    # --- Run Checkpoints ---
+    CHECKPOINT_SAVE_INTERVAL: float = Field(default=5.0, env="CHECKPOINT_SAVE_INTERVAL") # Min seconds between checkpoint writes during a run
+    CHECKPOINT_TTL_DAYS: int = Field(default=7, env="CHECKPOINT_TTL_DAYS") # Runs older than this can't be resumed
+
+    # --- Scraping ---
+    LINKEDIN_FEED_URL: str = Field(default="https://www.linkedin.com/feed/", env="LINKEDIN_FEED_URL") # Point at a local replay server for benchmarks
+    SCROLL_WAIT_TIMEOUT_MS: int = Field(default=5000, env="SCROLL_WAIT_TIMEOUT_MS") # Max wait for new posts after a scroll
+    SCROLL_STALL_LIMIT: int = Field(default=3, env="SCROLL_STALL_LIMIT") # Stop after this many scrolls with no growth
+    PRUNE_FINISHED_POSTS: bool = Field(default=True, env="PRUNE_FINISHED_POSTS") # Empty feed nodes once a post is handled, so long scrolls stay flat in memory
+    FEED_READY_TIMEOUT_MS: int = Field(default=30000, env="FEED_READY_TIMEOUT_MS") # Max wait for the first post after DOM load
+    BLOCK_RESOURCE_TYPES: str = Field(default="image,media,font", env="BLOCK_RESOURCE_TYPES") # Comma-separated Playwright resource types; empty allows all. Matched by URL pattern in the browser (keeps the HTTP cache), see utils.resource_policy
+    BLOCK_HOSTS: str = Field(
+        default="doubleclick.net,google-analytics.com,googletagmanager.com,px.ads.linkedin.com,snap.licdn.com,bat.bing.com,connect.facebook.net",
+        env="BLOCK_HOSTS"
+    ) # Analytics/ad hosts (and their subdomains) that are never loaded
+
+    # --- LLM Gateway ---
+    LLM_MAX_CONCURRENCY: int = Field(default=6, env="LLM_MAX_CONCURRENCY") # LLM requests in flight, across all runs
+    LLM_TIMEOUT_SECONDS: float = Field(default=60.0, env="LLM_TIMEOUT_SECONDS") # Per attempt (per chunk when streaming)
+    LLM_MAX_RETRIES: int = Field(default=3, env="LLM_MAX_RETRIES") # Retries of 429s, 5xx and timeouts
+    LLM_BACKOFF_BASE_SECONDS: float = Field(default=1.0, env="LLM_BACKOFF_BASE_SECONDS")
+    LLM_BACKOFF_MAX_SECONDS: float = Field(default=20.0, env="LLM_BACKOFF_MAX_SECONDS")
+    LLM_BREAKER_THRESHOLD: int = Field(default=5, env="LLM_BREAKER_THRESHOLD") # Consecutive failures that open the circuit
+    LLM_BREAKER_RESET_SECONDS: float = Field(default=30.0, env="LLM_BREAKER_RESET_SECONDS")
+    LLM_HEDGE_AFTER_SECONDS: float = Field(default=0.0, env="LLM_HEDGE_AFTER_SECONDS") # Send a duplicate request after this long (0 disables)
+
+    # --- Feed Pipeline ---
+    PIPELINE_LLM_WORKERS: int = Field(default=3, env="PIPELINE_LLM_WORKERS") # Concurrent comment generations
+    PIPELINE_QUEUE_SIZE: int = Field(default=10, env="PIPELINE_QUEUE_SIZE") # Max posts buffered between stages
+    LLM_BATCH_MAX_POSTS: int = Field(default=8, env="LLM_BATCH_MAX_POSTS") # Posts per comment request (1 disables batching)
+    LLM_BATCH_TOKEN_BUDGET: int = Field(default=6000, env="LLM_BATCH_TOKEN_BUDGET") # Approx. post tokens per request
+    POST_MAX_TOKENS: int = Field(default=400, env="POST_MAX_TOKENS") # Post text is cut to about this many tokens before prompting (0 keeps it whole)
+
+    # --- Comment Cache ---
+    COMMENT_CACHE_SIZE: int = Field(default=2000, env="COMMENT_CACHE_SIZE") # In-memory LRU entries
+    COMMENT_CACHE_TTL_DAYS: int = Field(default=30, env="COMMENT_CACHE_TTL_DAYS")
+    PROCESSED_INDEX_CACHE_SIZE: int = Field(default=50000, env="PROCESSED_INDEX_CACHE_SIZE") # Processed URNs/hashes kept in memory
+
+    # --- CommentLog Write-behind ---
+    LOG_SINK_MAX_BUFFER: int = Field(default=500, env="LOG_SINK_MAX_BUFFER") # put() waits once this many logs are pending
+    LOG_SINK_BATCH_SIZE: int = Field(default=20, env="LOG_SINK_BATCH_SIZE")
+    LOG_SINK_FLUSH_INTERVAL: float = Field(default=2.0, env="LOG_SINK_FLUSH_INTERVAL") # Seconds
+
+    # --- Summary ---
+    SUMMARY_CHUNK_TOKENS: int = Field(default=6000, env="SUMMARY_CHUNK_TOKENS") # Approx. post tokens per partial summary
+    SUMMARY_MAP_CONCURRENCY: int = Field(default=2, env="SUMMARY_MAP_CONCURRENCY") # Partial summaries running at once
+
+    # --- WebSocket ---
+    WS_CLIENT_QUEUE_SIZE: int = Field(default=200, env="WS_CLIENT_QUEUE_SIZE") # Clients further behind than this are dropped
+    EVENT_BUFFER_SIZE: int = Field(default=1000, env="EVENT_BUFFER_SIZE") # Replayable events kept per run
+    EVENT_BUFFER_MAX_RUNS: int = Field(default=50, env="EVENT_BUFFER_MAX_RUNS") # Runs kept in memory
+    EVENT_LOG_DIR: str = Field(default="", env="EVENT_LOG_DIR") # Append run events as JSONL here ("" disables)
+
+    # --- Near-duplicate Detection ---
+    NEAR_DUP_ENABLED: bool = Field(default=True, env="NEAR_DUP_ENABLED") # Collapse reshares/reposts before any LLM call
+    NEAR_DUP_MAX_DISTANCE: int = Field(default=6, env="NEAR_DUP_MAX_DISTANCE") # Max differing SimHash bits (of 64); unrelated posts differ in ~20-32. Only reliable for long posts: a ~25-word reshare with a phrase added is 5-19 bits away
+    NEAR_DUP_SHORT_SHINGLES: int = Field(default=48, env="NEAR_DUP_SHORT_SHINGLES") # Posts with fewer shingles (~50 words) are also matched by shingle containment
+    NEAR_DUP_MIN_CONTAINMENT: float = Field(default=0.8, env="NEAR_DUP_MIN_CONTAINMENT") # Calibrated on ~29-word posts: catches 99.3% of reshares (prefix/suffix/hashtags/one swapped word; SimHash alone 52%), 0 of 2000 unrelated posts sharing the feed's vocabulary; 0.7 also merges one-phrase template variants
+    NEAR_DUP_MIN_TOKENS: int = Field(default=12, env="NEAR_DUP_MIN_TOKENS") # Shorter posts are too noisy to fingerprint
+    NEAR_DUP_INDEX_SIZE: int = Field(default=5000, env="NEAR_DUP_INDEX_SIZE") # Recent fingerprints each run compares against
+    NEAR_DUP_TTL_DAYS: int = Field(default=7, env="NEAR_DUP_TTL_DAYS")
+
+    # --- Pre-filter ---
+    PREFILTER_ENABLED: bool = Field(default=True, env="PREFILTER_ENABLED")
+    PREFILTER_MIN_CHARS: int = Field(default=60, env="PREFILTER_MIN_CHARS") # Shorter posts are skipped without an LLM call
+    PREFILTER_CLASSIFIER_ENABLED: bool = Field(default=False, env="PREFILTER_CLASSIFIER_ENABLED")
+    PREFILTER_CLASSIFIER_THRESHOLD: float = Field(default=0.9, env="PREFILTER_CLASSIFIER_THRESHOLD") # Min SKIP probability
+    PREFILTER_TRAINING_LIMIT: int = Field(default=2000, env="PREFILTER_TRAINING_LIMIT") # Past posts used for training
     
     class Config:
         env_file = ".env"
@@ -1,31 +1,83 @@
-from utils.workflow import get_workflow, AgentState
-from models.api_models import AgentStartRequest, AgentStartResponse
+import asyncio
+import time
+import uuid
+from typing import Optional, TYPE_CHECKING
+from utils.event_log import event_log
+from utils.connection_manager import manager
+from utils.metrics import start_run, finish_run
+from utils.run_checkpoint import checkpoint_store
+from utils.browser_pool import browser_pool
+from utils.llm_gateway import llm_gateway
+from models.api_models import AgentStartRequest
+
+if TYPE_CHECKING:
+    from utils.workflow import AgentState
+
+_workflow_lock = asyncio.Lock()
+
+async def load_workflow():
+    """
+    The compiled LangGraph workflow. utils.workflow (LangGraph, Playwright and
+    the rest of the agent stack) is imported on first use, in a worker thread
+    so the event loop keeps serving requests meanwhile.
+    """
+    async with _workflow_lock:
+        def load():
+            from utils.workflow import get_workflow
+            return get_workflow()
+        return await asyncio.to_thread(load)
+
+async def warm_up():
+    """Loads the agent stack and starts the browser pool in the background, so the first run starts warm."""
+    started = time.perf_counter()
+    try:
+        await load_workflow()
+        # Builds the Gemini client (and imports its SDK) off the event loop
+        await asyncio.to_thread(lambda: llm_gateway.llm)
+        print(f"Agent workflow loaded in {time.perf_counter() - started:.1f}s.")
+        await browser_pool.start()
+    except Exception as e:
+        # Not fatal: the first run loads whatever is still missing
+        print(f"Warm-up failed: {e}")
 
 async def run_linkedin_agent(
-    request: AgentStartRequest
-) -> AgentStartResponse:
+    request: AgentStartRequest,
+    run_id: Optional[str] = None
+) -> "AgentState":
+    """Runs the whole LangGraph workflow for one request and returns its final state."""
     
-    workflow = get_workflow()
+    workflow = await load_workflow()
+    run_id = run_id or uuid.uuid4().hex
     
-    initial_state: AgentState = {
+    initial_state: "AgentState" = {
+        "run_id": run_id, # Dashboards subscribe to this run's events
         "auto_comment": request.auto_comment,
         "auto_like": request.auto_like,
         "max_posts": request.max_posts_to_process,
         "cookie_json": request.cookie_json, # <-- PASS COOKIES
+        "feed_done": False,
         "user_voice_prompt": "",
-        "scraped_posts": [],
+        "summary_source": [],
         "final_logs": [],
+        "run_stats": {},
+        "summary_parts": [],
         "summary": "Process did not complete.",
         "error": None
     }
     
-    # We run this in the background so the HTTP request can return immediately
-    # Note: This uses FastAPI's background tasks. For heavy production,
-    # you'd use Celery or ARQ.
-    await workflow.ainvoke(initial_state)
-    
-    # Return an immediate response to the client
-    return AgentStartResponse(
-        status="Success",
-        message="Agent run started successfully. Check the dashboard for live updates."
-    )
\ No newline at end of file
+    # Runs are queued and started by utils.job_scheduler, which calls this
+    run_metrics = start_run(run_id)
+    try:
+        # Per-post progress, so a failed run can be resumed from where it stopped
+        await checkpoint_store.open(run_id, request)
+        final_state = await workflow.ainvoke(initial_state)
+
+        # Per-stage timings end up in the job record and on the dashboard
+        metrics_summary = run_metrics.summary()
+        final_state.setdefault('run_stats', {})['metrics'] = metrics_summary
+        await manager.broadcast({"type": "metrics", "metrics": metrics_summary}, run_id=run_id)
+        return final_state
+    finally:
+        await checkpoint_store.close(run_id)
+        finish_run(run_id)
+        event_log.finish(run_id)
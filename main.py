@@ -1,5 +1,7 @@
 import asyncio
 import sys
+from contextlib import asynccontextmanager
+from typing import Optional
 
 # FIX: Add this check right at the top of main.py
 if sys.platform == "win32":
@@ -10,8 +12,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from utils.limiter import limiter
-from routers import agent, admin  # <-- ADD ADMIN
+from routers import agent, admin, metrics, history  # <-- ADD ADMIN
 from config.database import init_db
+from config.settings import settings
+from controllers.agent_controller import warm_up
+from utils.browser_pool import browser_pool
+from utils.log_sink import log_sink
+from utils.job_scheduler import job_scheduler
 from utils.connection_manager import manager
 import uvicorn
 from dotenv import load_dotenv
@@ -19,10 +26,30 @@ import os
 
 load_dotenv()
 
+# --- Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("Server starting up...")
+    await init_db()
+    print("Database connection initialized.")
+    log_sink.start()
+    await job_scheduler.start()
+    # The app serves requests right away; the agent stack and the browsers load behind it
+    warm_up_task = asyncio.create_task(warm_up()) if settings.AGENT_WARM_UP else None
+    yield
+    print("Server shutting down...")
+    if warm_up_task:
+        warm_up_task.cancel()
+        await asyncio.gather(warm_up_task, return_exceptions=True)
+    await job_scheduler.close()
+    await log_sink.close()
+    await browser_pool.close()
+
 app = FastAPI(
     title="LinkedIn Browse Agent",
     description="Browses LinkedIn, generates comments, and summarizes the feed.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- Middleware ---
@@ -36,25 +63,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Event Handlers ---
-@app.on_event("startup")
-async def on_startup():
-    print("Server starting up...")
-    await init_db()
-    print("Database connection initialized.")
-
 # --- Routers ---
 app.include_router(agent.router)
 app.include_router(admin.router)  # <-- ADD ADMIN ROUTER
+app.include_router(metrics.router)
+app.include_router(history.router)
 
 # --- WebSocket Endpoint ---
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, run_id: Optional[str] = None, last_seq: int = 0):
+    # ?run_id=<id> limits the stream to one run; without it the client sees every run.
+    # &last_seq=<n> resumes after the last event the client saw.
+    await manager.connect(websocket, run_id=run_id, last_seq=last_seq)
     try:
         while True:
             await websocket.receive_text()
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the server already closed the socket (a client too slow to keep up)
+        pass
+    finally:
         manager.disconnect(websocket)
 
 @app.get("/")
@@ -0,0 +1,28 @@
+from beanie import Document, Indexed
+from pydantic import Field
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+class AgentJob(Document):
+    # The job ID doubles as the run ID used for WebSocket events.
+    # Cookies are never stored here; they only live in memory while queued.
+    job_id: Indexed(str, unique=True)
+    status: str = Field(default="queued") # queued | running | succeeded | failed | cancelled | timed_out
+    priority: int = Field(default=0) # Higher runs first
+    account_key: str
+    auto_comment: bool = Field(default=False)
+    auto_like: bool = Field(default=False)
+    max_posts: int = Field(default=5)
+    resumed_from: Optional[str] = None # Run whose checkpoint this job continues
+
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    logs: List[Dict[str, Any]] = Field(default_factory=list)
+    run_stats: Dict[str, Any] = Field(default_factory=dict)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "agent_jobs"
@@ -1,14 +1,49 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Dict, Any
+from datetime import datetime
 
 class AgentStartRequest(BaseModel):
     auto_comment: bool = False
     auto_like: bool = False
     max_posts_to_process: int = 5
     cookie_json: str # We now expect the cookie JSON as a string
+    priority: int = 0 # Higher priority runs leave the queue first
+    resume_from: Optional[str] = None # Set by /agent/resume: continue this run's checkpoint
+
+class AgentResumeRequest(BaseModel):
+    cookie_json: str # Cookies are never stored, so a resume needs them again
+    priority: int = 0
 
 class AgentStartResponse(BaseModel):
     # This model should ONLY expect the immediate response
     # from the /agent/start endpoint.
     status: str
-    message: str
\ No newline at end of file
+    message: str
+    run_id: Optional[str] = None # Subscribe with /ws?run_id=<run_id> for this run's events
+    job_id: Optional[str] = None # Poll /agent/jobs/<job_id> for status and results
+
+class RunEventsResponse(BaseModel):
+    run_id: str
+    events: List[Dict[str, Any]] # Each event carries its "seq" number
+
+class CommentLogEntry(BaseModel):
+    # One CommentLog as the history API returns it; post_content only on request
+    id: str
+    post_urn: Optional[str] = None
+    post_author: str
+    post_content: Optional[str] = None
+    generated_comment: str
+    posted_to_linkedin: bool
+    liked_post: bool
+    skipped: bool
+    created_at: datetime
+
+class CommentLogPage(BaseModel):
+    items: List[CommentLogEntry]
+    next_cursor: Optional[str] = None # Pass as ?cursor= for the next (older) page; None on the last page
+
+class AnalyticsResponse(BaseModel):
+    since: str # YYYY-MM-DD, inclusive (UTC days)
+    until: str
+    group_by: str # day | author
+    rows: List[Dict[str, Any]] # posts_seen, comments_posted, likes, skipped, skip_rate
@@ -0,0 +1,21 @@
+from beanie import Document, Indexed
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from config.settings import settings
+
+class CachedComment(Document):
+    # sha256 of (voice/system prompt, model, temperature bucket, normalized post content)
+    key: Indexed(str, unique=True)
+    comment: str # Either the generated comment or [SKIP]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "comment_cache"
+        indexes = [
+            # Mongo drops entries on its own once they are older than the TTL
+            IndexModel(
+                [("created_at", ASCENDING)],
+                expireAfterSeconds=settings.COMMENT_CACHE_TTL_DAYS * 24 * 3600
+            )
+        ]
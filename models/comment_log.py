@@ -1,15 +1,40 @@
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from datetime import datetime
 from typing import Optional
 
 class CommentLog(Document):
+    account_key: Optional[str] = None # LinkedIn account that handled the post (utils.accounts.account_key)
+    post_urn: Optional[str] = None
+    content_hash: Optional[str] = None # sha256 of the normalized post content
     post_author: str
-    post_content: str = Field(..., index=True)
+    post_content: str
     generated_comment: str
     posted_to_linkedin: bool = Field(default=False)
     liked_post: bool = Field(default=False)
+    skipped: bool = Field(default=False) # The LLM answered [SKIP]; nothing was done on LinkedIn
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
-        name = "comment_logs" # This is the collection name
\ No newline at end of file
+        name = "comment_logs" # This is the collection name
+        indexes = [
+            # Small, fixed-size keys used to skip posts an account handled in
+            # earlier runs; other accounts still get to act on the same post.
+            # Partial so older logs without a URN/hash don't collide on null.
+            IndexModel(
+                [("account_key", ASCENDING), ("post_urn", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"post_urn": {"$type": "string"}}
+            ),
+            IndexModel(
+                [("account_key", ASCENDING), ("content_hash", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"content_hash": {"$type": "string"}}
+            ),
+            # History pages walk (created_at, _id) newest first; the filtered
+            # variants keep the common filters on an index as well.
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("post_author", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("posted_to_linkedin", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
@@ -0,0 +1,21 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+
+class DailyRollup(Document):
+    # Running totals of the CommentLog, per UTC day and post author.
+    # author == "" holds the day's totals across all authors.
+    day: str # YYYY-MM-DD
+    author: str = Field(default="")
+    posts_seen: int = Field(default=0) # Every logged post, skips included
+    comments_posted: int = Field(default=0)
+    likes: int = Field(default=0)
+    skipped: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "daily_rollups"
+        indexes = [
+            IndexModel([("day", ASCENDING), ("author", ASCENDING)], unique=True),
+        ]
@@ -0,0 +1,26 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from datetime import datetime
+from typing import List, Optional
+from config.settings import settings
+
+class PostFingerprint(Document):
+    # 64-bit SimHash of a handled post's text, so reshares and reposts of it
+    # are recognized in later runs (see utils.near_dup)
+    account_key: Optional[str] = None # Account whose run handled the post; other accounts don't see it as a duplicate
+    post_urn: str
+    simhash: int # Stored signed: Mongo integers are int64
+    shingles: Optional[List[int]] = None # Short posts only: signed shingle hashes for the containment check
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "post_fingerprints"
+        indexes = [
+            IndexModel(
+                [("created_at", ASCENDING)],
+                expireAfterSeconds=settings.NEAR_DUP_TTL_DAYS * 24 * 3600
+            ),
+            # The newest-first load of one account's fingerprints at the start of each run
+            IndexModel([("account_key", ASCENDING), ("created_at", DESCENDING)]),
+        ]
@@ -0,0 +1,37 @@
+from beanie import Document, Indexed
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from config.settings import settings
+
+class RunCheckpoint(Document):
+    # Progress of one run, so a failed run can be resumed (POST /agent/resume/<run_id>).
+    # A resumed run takes the checkpoint over under its own run ID; cookies are never stored.
+    run_id: Indexed(str, unique=True)
+    resumed_from: Optional[str] = None
+    account_key: str
+    auto_comment: bool = Field(default=False)
+    auto_like: bool = Field(default=False)
+    max_posts: int = Field(default=5)
+
+    stage: str = Field(default="process_feed") # process_feed | generate_summary | done
+    done_urns: List[str] = Field(default_factory=list) # Acted on or skipped; never handled twice
+    comments: Dict[str, str] = Field(default_factory=dict) # urn -> generated comment not acted on yet
+    final_logs: List[Dict[str, Any]] = Field(default_factory=list)
+
+    # Set once the feed is done, for a run that fails while summarizing
+    run_stats: Dict[str, Any] = Field(default_factory=dict)
+    summary_parts: List[str] = Field(default_factory=list)
+    summary_source: List[str] = Field(default_factory=list)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "run_checkpoints"
+        indexes = [
+            IndexModel(
+                [("updated_at", ASCENDING)],
+                expireAfterSeconds=settings.CHECKPOINT_TTL_DAYS * 24 * 3600
+            )
+        ]
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(slots=True)
+class ScrapedPost:
+    # Plain data only: no element handles, so a post costs a few hundred bytes
+    # and nothing in the page is kept alive by Python.
+    urn: str
+    author: str
+    content: str
+    content_hash: Optional[str] = None # Set by utils.processed_index
@@ -0,0 +1,21 @@
+from beanie import Document, Indexed
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from config.settings import settings
+
+class SessionState(Document):
+    # One warm Playwright session per LinkedIn account (see utils.accounts.account_key)
+    account_key: Indexed(str, unique=True)
+    encrypted_state: str # Fernet token of the storage_state JSON; cookies never sit here in clear text
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "session_states"
+        indexes = [
+            # A snapshot nobody refreshed in this long is dropped by Mongo
+            IndexModel(
+                [("updated_at", ASCENDING)],
+                expireAfterSeconds=settings.SESSION_STATE_MAX_AGE_DAYS * 24 * 3600
+            )
+        ]
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, Header, HTTPException, status, Body
 from typing import Annotated
 from config.settings import settings
 from models.selectors import SelectorConfig
+from utils.comment_cache import comment_cache
+from utils.rollups import rollup_store
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -54,4 +56,40 @@ async def update_selectors(selectors: SelectorConfig = Body(...)):
         # We use model_update to apply the changes from the request body
         existing_config.model_update(selectors)
         await existing_config.save()
-        return existing_config
\ No newline at end of file
+        return existing_config
+
+@router.get(
+    "/comment-cache",
+    dependencies=[Depends(verify_admin_key)]
+)
+async def get_comment_cache_stats():
+    """
+    Returns the comment cache size and hit/miss counters
+    since the server started.
+    """
+    return await comment_cache.stats()
+
+@router.delete(
+    "/comment-cache",
+    dependencies=[Depends(verify_admin_key)]
+)
+async def purge_comment_cache():
+    """
+    Empties the comment cache (memory and database).
+    The next runs will ask the LLM again for every post.
+    """
+    deleted = await comment_cache.purge()
+    return {"success": True, "deleted": deleted}
+
+@router.post(
+    "/rollups/rebuild",
+    dependencies=[Depends(verify_admin_key)]
+)
+async def rebuild_rollups():
+    """
+    Recomputes the daily analytics rollups from the whole CommentLog.
+    Needed once for logs written before rollups existed; best run
+    while no agent run is writing logs.
+    """
+    rows = await rollup_store.rebuild()
+    return {"success": True, "rollups": rows}
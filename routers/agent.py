@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Request, Depends, Body, BackgroundTasks
+from fastapi import APIRouter, Request, Depends, Body, HTTPException, status
 from utils.limiter import limiter
-from controllers import agent_controller
-from models.api_models import AgentStartRequest, AgentStartResponse
+from models.api_models import AgentStartRequest, AgentStartResponse, AgentResumeRequest, RunEventsResponse
+from models.agent_job import AgentJob
+from utils.event_log import event_log
+from utils.job_scheduler import job_scheduler, QueueFullError
+from utils.run_checkpoint import checkpoint_store, ResumeError
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
 
@@ -9,21 +12,115 @@ router = APIRouter(prefix="/agent", tags=["Agent"])
 @limiter.limit("1/minute")
 async def start_agent(
     request: Request, 
-    background_tasks: BackgroundTasks, # <-- Add BackgroundTasks
     body: AgentStartRequest = Body(...)
 ):
     """
-    Starts the LinkedIn browsing agent.
-    The agent run is processed in the background.
-    Live updates are sent via WebSocket to /ws.
+    Queues a LinkedIn browsing agent run.
+    The run starts as soon as the scheduler has capacity for it.
+    Follow it with GET /agent/jobs/{job_id}, or live via WebSocket
+    at /ws?run_id=<run_id> (the job ID is also the run ID).
     """
     print("Agent /start endpoint triggered.")
+    if body.resume_from:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Use POST /agent/resume/{run_id} to resume a run."
+        )
     
-    # Add the long-running task to the background
-    background_tasks.add_task(agent_controller.run_linkedin_agent, request=body)
+    try:
+        job = await job_scheduler.submit(body, priority=body.priority)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     
     # Return an immediate response
     return AgentStartResponse(
-        status="Started",
-        message="Agent run queued. Check the dashboard for live updates."
-    )
\ No newline at end of file
+        status="Queued",
+        message="Agent run queued. Check the dashboard for live updates.",
+        run_id=job.job_id,
+        job_id=job.job_id
+    )
+
+@router.post("/resume/{run_id}", response_model=AgentStartResponse)
+@limiter.limit("1/minute")
+async def resume_agent(
+    request: Request,
+    run_id: str,
+    body: AgentResumeRequest = Body(...)
+):
+    """
+    Queues a new run that continues a failed, cancelled or timed-out one
+    from its checkpoint: posts it already handled are skipped and comments
+    it already generated are reused. The new run has its own run ID.
+    """
+    try:
+        checkpoint = await checkpoint_store.check_resumable(run_id, body.cookie_json)
+    except ResumeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+    resume_request = AgentStartRequest(
+        auto_comment=checkpoint.auto_comment,
+        auto_like=checkpoint.auto_like,
+        max_posts_to_process=checkpoint.max_posts,
+        cookie_json=body.cookie_json,
+        priority=body.priority,
+        resume_from=run_id
+    )
+    try:
+        job = await job_scheduler.submit(resume_request, priority=body.priority)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+    return AgentStartResponse(
+        status="Queued",
+        message=f"Resuming run {run_id}. Check the dashboard for live updates.",
+        run_id=job.job_id,
+        job_id=job.job_id
+    )
+
+@router.get("/jobs/{job_id}", response_model=AgentJob)
+async def get_job(job_id: str):
+    """
+    Returns the status of a run and, once it finished,
+    its summary, logs and stats.
+    """
+    job = await job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancels a queued or running job."""
+    if not await job_scheduler.cancel(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is not queued or running"
+        )
+    return {"success": True, "job_id": job_id}
+
+
+@router.get("/runs/{run_id}/events", response_model=RunEventsResponse)
+async def get_run_events(run_id: str):
+    """
+    Returns the recorded events of a run, in order.
+    Useful to rebuild a dashboard for a run that already finished.
+    """
+    events = event_log.history(run_id)
+    if events is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No events recorded for this run"
+        )
+    return RunEventsResponse(run_id=run_id, events=events)
@@ -0,0 +1,126 @@
+import base64
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+from bson import ObjectId
+from bson.errors import InvalidId
+from beanie import PydanticObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel, Field
+from pymongo import DESCENDING
+from models.api_models import CommentLogEntry, CommentLogPage, AnalyticsResponse
+from models.comment_log import CommentLog
+from routers.admin import verify_admin_key
+from utils.limiter import limiter
+from utils.rollups import rollup_store
+
+# Generated comments and post bodies: admin key only, like the admin routes
+router = APIRouter(prefix="/history", tags=["History"], dependencies=[Depends(verify_admin_key)])
+
+
+# --- Projections ---
+class _LogView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    post_urn: Optional[str] = None
+    post_author: str
+    generated_comment: str
+    posted_to_linkedin: bool = False
+    liked_post: bool = False
+    skipped: bool = False
+    created_at: datetime
+
+class _LogViewWithContent(_LogView):
+    post_content: Optional[str] = None
+
+
+# --- Cursors ---
+def encode_cursor(created_at: datetime, doc_id: ObjectId) -> str:
+    raw = f"{created_at.isoformat()}|{doc_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, doc_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), ObjectId(doc_id)
+    except (ValueError, InvalidId, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+# --- Endpoints ---
+@router.get("/comments", response_model=CommentLogPage)
+@limiter.limit("5/second")
+async def list_comment_logs(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    author: Optional[str] = None,
+    posted: Optional[bool] = None,
+    liked: Optional[bool] = None,
+    skipped: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_content: bool = False
+):
+    """
+    Pages through past CommentLogs, newest first.
+    Pass the returned next_cursor to get the next page; pages stay
+    stable while new logs are written, and each page is one indexed query.
+    Post content is left out unless include_content=true.
+    """
+    clauses: List[Dict[str, Any]] = []
+    if author is not None:
+        clauses.append({"post_author": author})
+    for field, value in (("posted_to_linkedin", posted), ("liked_post", liked), ("skipped", skipped)):
+        if value is not None:
+            clauses.append({field: value})
+    if since is not None:
+        clauses.append({"created_at": {"$gte": since}})
+    if until is not None:
+        clauses.append({"created_at": {"$lt": until}})
+    if cursor:
+        # Keyset pagination: strictly older than the last item of the previous page
+        created_at, doc_id = decode_cursor(cursor)
+        clauses.append({"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]})
+
+    view = _LogViewWithContent if include_content else _LogView
+    docs = await CommentLog.find({"$and": clauses} if clauses else {}) \
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)]) \
+        .limit(limit + 1) \
+        .project(view) \
+        .to_list()
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    return CommentLogPage(
+        items=[CommentLogEntry(**{**doc.model_dump(), "id": str(doc.id)}) for doc in docs],
+        next_cursor=encode_cursor(docs[-1].created_at, docs[-1].id) if has_more else None
+    )
+
+@router.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    days: int = Query(30, ge=1, le=366),
+    group_by: str = Query("day", pattern="^(day|author)$"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Activity over the last `days` UTC days: posts seen, comments posted,
+    likes and skip rate, per day or per author (most active first).
+    Served from the daily rollups, never from a scan of the logs.
+    """
+    until = datetime.utcnow()
+    since = until - timedelta(days=days - 1)
+    if group_by == "author":
+        rows = await rollup_store.by_author(since, until, limit)
+    else:
+        rows = await rollup_store.by_day(since, until)
+    return AnalyticsResponse(
+        since=since.strftime("%Y-%m-%d"),
+        until=until.strftime("%Y-%m-%d"),
+        group_by=group_by,
+        rows=rows
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from utils.metrics import registry
+from utils.browser_pool import browser_pool
+from utils.job_scheduler import job_scheduler
+from utils.llm_gateway import llm_gateway
+
+router = APIRouter(tags=["Metrics"])
+
+# browser_pool.stats() walks /proc for the browser process tree, so it's read once per scrape
+_pool_stats = {}
+
+# --- Live gauges (read on every scrape) ---
+registry.gauge("agent_jobs_queued", "Agent runs waiting for a free slot.", function=lambda: job_scheduler.stats()["queued"])
+registry.gauge("agent_jobs_running", "Agent runs in progress.", function=lambda: job_scheduler.stats()["running"])
+registry.gauge("agent_browser_active_contexts", "Browser contexts currently lent to runs.", function=lambda: _pool_stats.get("active_contexts"))
+registry.gauge("agent_browser_rss_megabytes", "Resident memory of the browser process tree.", function=lambda: _pool_stats.get("rss_mb"))
+registry.gauge("agent_llm_in_flight", "LLM requests currently in flight.", function=lambda: llm_gateway.stats()["in_flight"])
+registry.gauge("agent_llm_circuit_open", "1 while the LLM circuit breaker rejects calls.", function=lambda: int(llm_gateway.stats()["circuit"] == "open"))
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    _pool_stats.update(browser_pool.stats())
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
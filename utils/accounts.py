@@ -0,0 +1,18 @@
+import hashlib
+import json
+
+def account_key(cookie_json: str) -> str:
+    """
+    Stable, non-reversible ID for the LinkedIn account behind a cookie export.
+    Uses the `li_at` session cookie when present, so re-exported cookies for
+    the same session map to the same account.
+    """
+    identity = cookie_json
+    try:
+        for cookie in json.loads(cookie_json):
+            if cookie.get("name") == "li_at" and cookie.get("value"):
+                identity = cookie["value"]
+                break
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        pass
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
@@ -1,20 +1,117 @@
 import asyncio
-from playwright.async_api import async_playwright, Page, BrowserContext
 from config.settings import settings
 import json
-from typing import List, Dict, Any
-import random
+from typing import List, Dict, Any, AsyncIterator, Optional
+from urllib.parse import urlparse
 from models.selectors import SelectorConfig
+from models.scraped_post import ScrapedPost
+from utils.browser_pool import browser_pool, BrowserPool
+from utils.metrics import RunMetrics, span
+from utils.accounts import account_key
+from utils.session_store import SessionStore, session_store
+from utils.pacer import ActionPacer, action_pacer
+from utils.resource_policy import ResourcePolicy, NetworkStats, resource_policy, install as install_network_policy
+
+# Runs inside the page. Collects every post container not extracted yet and
+# marks it, so each scroll only ships the new posts back to Python.
+EXTRACT_NEW_POSTS_JS = """
+({ container, author, content, limit }) => {
+    const posts = [];
+    for (const el of document.querySelectorAll(container)) {
+        if (posts.length >= limit) break;
+        if (el.hasAttribute("data-agent-seen")) continue;
+
+        const urn = el.getAttribute("data-urn");
+        const authorText = el.querySelector(author)?.textContent?.trim();
+        const contentText = el.querySelector(content)?.textContent?.trim();
+        // Not rendered yet (or not a regular post); look at it again next scroll
+        if (!urn || !authorText || !contentText) continue;
+
+        el.setAttribute("data-agent-seen", "1");
+        posts.push({ urn: urn, author: authorText, content: contentText });
+    }
+    return posts;
+}
+"""
+
+# Scrolls the feed and resolves as soon as new post containers are attached
+# (or after `timeout` ms). Mutations are checked at most once per frame.
+SCROLL_AND_WAIT_JS = """
+({ container, timeout }) => new Promise((resolve) => {
+    const count = () => document.querySelectorAll(container).length;
+    const before = count();
+    let scheduled = false;
+    let timer = null;
+
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve({ before: before, after: count() });
+    };
+    const observer = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(() => {
+            scheduled = false;
+            if (count() > before) finish();
+        });
+    });
+
+    observer.observe(document.body, { childList: true, subtree: true });
+    timer = setTimeout(finish, timeout);
+    window.scrollBy(0, window.innerHeight * 0.8);
+})
+"""
+
+# Hollows out feed nodes the agent is done with. Their subtrees (images,
+# videos, comment threads) are freed, while the empty node keeps its height
+# and URN so the scroll position, the lazy loader and post counts don't change.
+PRUNE_POSTS_JS = """
+({ container, urns }) => {
+    const done = new Set(urns);
+    const nodes = [...document.querySelectorAll(container)].filter(
+        (el) => done.has(el.getAttribute("data-urn")) && !el.hasAttribute("data-agent-pruned")
+    );
+    // Read every height before writing, so layout is computed once
+    const heights = nodes.map((el) => el.offsetHeight);
+    nodes.forEach((el, i) => {
+        el.style.height = heights[i] + "px";
+        el.replaceChildren();
+        el.setAttribute("data-agent-pruned", "1");
+    });
+    return nodes.length;
+}
+"""
 
 class LinkedInAutomator:
-    def __init__(self, cookie_json: str, auto_like: bool = False, auto_comment: bool = False):
-        self.browser = None
+    def __init__(
+        self,
+        cookie_json: str,
+        auto_like: bool = False,
+        auto_comment: bool = False,
+        pool: BrowserPool = browser_pool,
+        metrics: Optional[RunMetrics] = None,
+        policy: ResourcePolicy = resource_policy,
+        sessions: Optional[SessionStore] = session_store,
+        pacer: ActionPacer = action_pacer
+    ):
+        self.pool = pool
+        self.sessions = sessions
+        self.pacer = pacer
+        self.account = account_key(cookie_json)
+        self.restored_session = False
+        self.metrics = metrics
+        self.policy = policy
+        self.network = NetworkStats()
         self.context = None
         self.page = None
         self.auto_like = auto_like
         self.auto_comment = auto_comment
         self.cookie_json = cookie_json # Store the cookie string
         self.selectors: SelectorConfig | None = None
+        self.scroll_timings: List[Dict[str, Any]] = []
+        self._finished_urns: List[str] = []
+        self.pruned_posts = 0
 
     async def fetch_selectors(self):
         """Fetches selectors from DB or uses defaults."""
@@ -28,11 +125,36 @@ class LinkedInAutomator:
         return self.selectors
 
     async def __aenter__(self):
-        playwright = await async_playwright().start()
-        # When deploying, you will change this to headless=True
-        self.browser = await playwright.chromium.launch(headless=True, slow_mo=500)
-        self.context = await self.browser.new_context()
-        
+        # A snapshot of this account's last good session skips the cookie import entirely
+        storage_state = None
+        if self.sessions:
+            try:
+                storage_state = await self.sessions.load(self.account)
+            except Exception as e:
+                print(f"Could not load the saved session: {e}")
+
+        # Borrow an isolated context from the warm, shared browser pool
+        context_options = {"storage_state": storage_state} if storage_state else {}
+        self.context = await self.pool.acquire_context(**context_options)
+        self.restored_session = storage_state is not None
+
+        # __aexit__ doesn't run when __aenter__ raises, so the context is handed back here
+        try:
+            if self.restored_session:
+                print("Restored the saved session for this account.")
+            else:
+                await self._add_cookies()
+
+            self.page = await self.context.new_page()
+            # Heavy resources and trackers are aborted in the browser; traffic is counted per run
+            await install_network_policy(self.context, self.page, self.policy, self.network)
+        except BaseException:
+            await self.pool.release_context(self.context)
+            self.context = None
+            raise
+        return self
+
+    async def _add_cookies(self):
         # Load saved session cookies FROM THE PASSED STRING
         try:
             # --- START: AUTOMATIC COOKIE FIX ---
@@ -61,33 +183,40 @@ class LinkedInAutomator:
         except Exception as e:
             print(f"Error loading cookies: {e}")
             raise
-            
-        self.page = await self.context.new_page()
-        return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
+            # Closes the context only; the browser stays warm for the next run
+            await self.pool.release_context(self.context)
+            self.context = None
         print("Playwright session closed.")
 
     async def go_to_feed(self):
         print("Navigating to LinkedIn feed...")
+        selectors = await self.fetch_selectors()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
         try:
-            # Increased timeout and using 'networkidle'
-            await self.page.goto("https://www.linkedin.com/feed/", wait_until="networkidle", timeout=90000)
+            with span("navigation", self.metrics):
+                # The feed keeps polling forever, so wait for the DOM rather than network idle
+                await self.page.goto(settings.LINKEDIN_FEED_URL, wait_until="domcontentloaded", timeout=90000)
         except Exception as e:
             print(f"Page.goto failed: {e}")
             raise Exception("Failed to load LinkedIn feed, server may be slow or page timed out. Try again.")
 
-        await asyncio.sleep(3) 
-
         # --- LOGIN CHECK ---
         current_url = self.page.url
         print(f"Current page URL: {current_url}")
 
-        if "linkedin.com/feed" not in current_url:
+        if not urlparse(current_url).path.startswith("/feed"):
+            if self.restored_session:
+                # The snapshot went stale: forget it and retry once with the exported cookies
+                print("Saved session is no longer logged in, falling back to the cookie export.")
+                await self.sessions.invalidate(self.account)
+                self.restored_session = False
+                await self.context.clear_cookies()
+                await self._add_cookies()
+                return await self.go_to_feed()
             if "login" in current_url:
                 raise Exception("Login failed. Cookies are invalid or expired. Please re-export new cookies.")
             if "checkpoint" in current_url or "challenge" in current_url:
@@ -97,90 +226,173 @@ class LinkedInAutomator:
         
         print("Login successful, on feed page.")
 
+        # Ready as soon as the first post is on screen
+        try:
+            with span("feed_ready", self.metrics):
+                await self.page.locator(selectors.post_container).first.wait_for(
+                    state="visible", timeout=settings.FEED_READY_TIMEOUT_MS
+                )
+        except Exception as e:
+            # An empty feed (or outdated selectors); scrolling will report "no posts"
+            print(f"No post became visible after {settings.FEED_READY_TIMEOUT_MS}ms: {e}")
+
+        self.network.load_ms = round((loop.time() - started) * 1000)
+        print(f"Feed ready in {self.network.load_ms}ms ({self.network.blocked} requests blocked).")
+
 
-    async def scroll_and_scrape_posts(self, max_posts: int) -> List[Dict[str, Any]]:
+    async def save_session(self):
+        """Snapshots the now-warm session so this account's next run can start from it."""
+        if not self.sessions or not self.context:
+            return
+        try:
+            await self.sessions.save(self.account, await self.context.storage_state())
+        except Exception as e:
+            print(f"Could not save the session snapshot: {e}")
+
+    async def scroll_and_scrape_posts(self, max_posts: int) -> List[ScrapedPost]:
+        posts_data = []
+        async for batch in self.iter_post_batches(max_posts):
+            posts_data.extend(batch)
+        return posts_data
+
+    async def iter_post_batches(self, max_posts: int) -> AsyncIterator[List[ScrapedPost]]:
+        """Scrolls the feed and yields the new posts found on each scroll as soon as they are extracted."""
         selectors = await self.fetch_selectors()
         print(f"Scrolling and scraping up to {max_posts} posts...")
-        posts_data = []
-        post_selector = selectors.post_container
+        scraped_count = 0
+        seen_urns = set()
+        self.scroll_timings = []
+        stalled_scrolls = 0
+        loop = asyncio.get_running_loop()
 
-        while len(posts_data) < max_posts:
-            await self.page.evaluate("window.scrollBy(0, window.innerHeight * 0.8);")
-            await asyncio.sleep(2.5)
-            
-            new_elements = await self.page.locator(post_selector).all()
-            
-            for post_element in new_elements:
-                post_urn = await post_element.get_attribute("data-urn")
-                if not post_urn or any(p['urn'] == post_urn for p in posts_data):
+        while scraped_count < max_posts:
+            await self.prune_finished_posts()
+
+            # One round trip per scroll: the page hands back only posts we haven't seen yet
+            with span("extract", self.metrics) as extract:
+                new_posts = await self.page.evaluate(EXTRACT_NEW_POSTS_JS, {
+                    "container": selectors.post_container,
+                    "author": selectors.author_selector,
+                    "content": selectors.content_selector,
+                    "limit": max_posts - scraped_count,
+                })
+                extract.set(posts=len(new_posts))
+
+            batch = []
+            for raw in new_posts:
+                if raw['urn'] in seen_urns:
                     continue
+                seen_urns.add(raw['urn'])
+                post = ScrapedPost(urn=raw['urn'], author=raw['author'], content=raw['content'])
+                batch.append(post)
+                print(f"Scraped post from {post.author}")
 
-                try:
-                    # AUTHOR
-                    author_name_locator = post_element.locator(selectors.author_selector).first
-                    author_name = await author_name_locator.text_content(timeout=5000)
-                    
-                    # CONTENT
-                    content_locator = post_element.locator(selectors.content_selector).first
-                    post_content = await content_locator.text_content(timeout=5000)
-
-                    if not post_content:
-                        continue
-
-                    posts_data.append({
-                        "urn": post_urn,
-                        "element": post_element,
-                        "author": author_name.strip(),
-                        "content": post_content.strip()
-                    })
-                    print(f"Scraped post from {author_name.strip()}")
-
-                    if len(posts_data) >= max_posts:
-                        break
-                except Exception as e:
-                    print(f"Error scraping post {post_urn}: {e}")
-            
-            if len(new_elements) == 0:
-                print("No posts found, ending.")
+            if batch:
+                batch = batch[:max_posts - scraped_count]
+                scraped_count += len(batch)
+                yield batch
+
+            if scraped_count >= max_posts:
                 break
-            
-            if len(posts_data) >= max_posts:
+
+            # Scroll, then wait only as long as it takes for new post containers to show up
+            started = loop.time()
+            with span("scroll", self.metrics):
+                scroll = await self.page.evaluate(SCROLL_AND_WAIT_JS, {
+                    "container": selectors.post_container,
+                    "timeout": settings.SCROLL_WAIT_TIMEOUT_MS,
+                })
+            wait_ms = (loop.time() - started) * 1000
+            self.scroll_timings.append({
+                "scroll": len(self.scroll_timings) + 1,
+                "wait_ms": round(wait_ms),
+                "new_posts": len(new_posts),
+                "containers": scroll['after'],
+            })
+            print(f"Scroll {len(self.scroll_timings)}: {scroll['before']} -> {scroll['after']} posts in {wait_ms:.0f}ms")
+
+            if scroll['after'] == 0:
+                print("No posts found, ending.")
                 break
 
-        return posts_data[:max_posts]
+            if scroll['after'] > scroll['before'] or new_posts:
+                stalled_scrolls = 0
+            else:
+                stalled_scrolls += 1
+                if stalled_scrolls >= settings.SCROLL_STALL_LIMIT:
+                    print(f"Feed stopped growing after {stalled_scrolls} scrolls, ending.")
+                    break
+
+    def finish_posts(self, *urns: str):
+        """Marks posts the agent is done with; their feed nodes are pruned on the next scroll."""
+        if settings.PRUNE_FINISHED_POSTS:
+            self._finished_urns.extend(urns)
+
+    async def prune_finished_posts(self):
+        if not self._finished_urns:
+            return
+        urns, self._finished_urns = self._finished_urns, []
+        try:
+            with span("prune", self.metrics):
+                self.pruned_posts += await self.page.evaluate(PRUNE_POSTS_JS, {
+                    "container": self.selectors.post_container,
+                    "urns": urns,
+                })
+        except Exception as e:
+            # Only memory is at stake; never fail the run over it
+            print(f"Could not prune finished posts: {e}")
+
+    async def wait_for_turn(self, action: str):
+        """Waits for this account's rate limit on a write action; timed separately from real work."""
+        with span("pacing", self.metrics):
+            await self.pacer.acquire(self.account, action)
+
+    async def pause(self):
+        with span("pacing", self.metrics):
+            await self.pacer.step()
+
+    def post_locator(self, urn: str):
+        """Resolves a scraped post back to its feed node, only when an action needs it."""
+        return self.page.locator(self.selectors.post_container).and_(
+            self.page.locator(f'[data-urn="{urn}"]')
+        ).first
 
-    async def perform_actions(self, post: Dict[str, Any], comment_text: str):
+    async def perform_actions(self, post: ScrapedPost, comment_text: str):
         selectors = await self.fetch_selectors()
-        post_element = post['element']
-        urn = post['urn']
+        urn = post.urn
+        post_element = self.post_locator(urn)
         posted_comment = False
         liked_post = False
         
         if self.auto_like:
             try:
                 like_button_selector = selectors.like_button
-                await post_element.locator(like_button_selector).first.click()
+                await self.wait_for_turn("like")
+                with span("action_like", self.metrics):
+                    await post_element.locator(like_button_selector).first.click()
                 print(f"Liked post {urn}")
                 liked_post = True
-                await asyncio.sleep(random.uniform(1.5, 3.0))
             except Exception as e:
                 print(f"Could not like post {urn}: {e}")
 
         if self.auto_comment and comment_text:
             try:
                 comment_button_selector = selectors.comment_button
-                await post_element.locator(comment_button_selector).first.click()
-                await asyncio.sleep(random.uniform(2.0, 4.0))
+                await self.wait_for_turn("comment")
+                with span("action_comment_open", self.metrics):
+                    await post_element.locator(comment_button_selector).first.click()
+                await self.pause()
 
                 comment_box_selector = selectors.comment_textbox
-                await post_element.locator(comment_box_selector).first.fill(comment_text)
-                await asyncio.sleep(random.uniform(2.5, 5.0))
+                with span("action_comment_fill", self.metrics):
+                    await post_element.locator(comment_box_selector).first.fill(comment_text)
+                await self.pause()
 
                 post_button_selector = selectors.comment_post_button
-                await post_element.locator(post_button_selector).first.click()
+                with span("action_comment_submit", self.metrics):
+                    await post_element.locator(post_button_selector).first.click()
                 print(f"Posted comment on {urn}")
                 posted_comment = True
-                await asyncio.sleep(random.uniform(3.0, 5.0))
             except Exception as e:
                 print(f"Could not comment on post {urn}: {e}")
         
@@ -0,0 +1,238 @@
+import asyncio
+import os
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+from config.settings import settings
+from utils.metrics import BROWSER_LAUNCHES
+
+if TYPE_CHECKING:
+    from playwright.async_api import Playwright, Browser, BrowserContext
+
+
+def _process_tree_rss_mb() -> Optional[float]:
+    """
+    Sums the resident memory of every process spawned by this one
+    (Playwright driver + Chromium). Reads /proc, so it only works on Linux;
+    returns None elsewhere.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    children: Dict[int, List[int]] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status", "r") as f:
+                ppid, rss = None, 0
+                for line in f:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+        pid = int(entry)
+        rss_kb[pid] = rss
+        if ppid is not None:
+            children.setdefault(ppid, []).append(pid)
+
+    total_kb = 0
+    stack = list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total_kb += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024
+
+
+class PooledBrowser:
+    """A single Chromium instance plus the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, browser: "Browser"):
+        self.browser = browser
+        self.active_contexts = 0
+        self.contexts_served = 0
+        self.retired = False
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retired and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Process-wide pool of warm Chromium browsers.
+
+    Runs don't launch a browser anymore: they borrow an isolated BrowserContext
+    from one of the pooled browsers and give it back when they are done.
+    A browser is recycled (closed and relaunched) once it has served
+    `max_contexts` contexts, when the browser tree goes above `max_memory_mb`,
+    or when it stops responding.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_contexts: int,
+        max_memory_mb: int,
+        health_check_interval: float,
+        launch_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.size = max(1, size)
+        self.max_contexts = max_contexts
+        self.max_memory_mb = max_memory_mb
+        self.health_check_interval = health_check_interval
+        self.launch_options = launch_options or {}
+
+        self._playwright: Optional["Playwright"] = None
+        self._browsers: List[PooledBrowser] = []
+        self._owners: Dict["BrowserContext", PooledBrowser] = {}
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self.launches = 0
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        async with self._lock:
+            if self.started:
+                return
+            # Playwright is imported when the pool starts, not when the app does
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            for _ in range(self.size):
+                self._browsers.append(await self._launch())
+            self._health_task = asyncio.create_task(self._health_loop())
+        print(f"Browser pool started with {self.size} browser(s).")
+
+    async def close(self):
+        async with self._lock:
+            if self._health_task:
+                self._health_task.cancel()
+                self._health_task = None
+            for pooled in self._browsers:
+                await self._close_browser(pooled)
+            self._browsers = []
+            self._owners = {}
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+        print("Browser pool closed.")
+
+    async def acquire_context(self, **context_options) -> "BrowserContext":
+        """Returns a fresh, isolated context on the least busy healthy browser."""
+        if not self.started:
+            # Runs started outside of the FastAPI app (scripts, benchmarks)
+            await self.start()
+
+        async with self._lock:
+            await self._replace_unhealthy()
+            healthy = [b for b in self._browsers if b.healthy]
+            pooled = min(healthy, key=lambda b: b.active_contexts)
+            pooled.active_contexts += 1
+            pooled.contexts_served += 1
+            # Checked with the increment, under the lock, so concurrent acquires can't overshoot the limit;
+            # a retired browser gets no new contexts and is closed once the ones it lent are back
+            if pooled.contexts_served >= self.max_contexts:
+                pooled.retired = True
+
+        try:
+            context = await pooled.browser.new_context(**context_options)
+        except Exception:
+            async with self._lock:
+                pooled.active_contexts -= 1
+                pooled.retired = True
+            raise
+
+        self._owners[context] = pooled
+        return context
+
+    async def release_context(self, context: "BrowserContext"):
+        """Closes a borrowed context and recycles its browser if it is due."""
+        pooled = self._owners.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"Error closing browser context: {e}")
+
+        if pooled is None:
+            return
+
+        async with self._lock:
+            pooled.active_contexts -= 1
+            self._retire_if_over_memory()
+            await self._replace_unhealthy()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "launches": self.launches,
+            "active_contexts": sum(b.active_contexts for b in self._browsers),
+            "contexts_served": [b.contexts_served for b in self._browsers],
+            "rss_mb": _process_tree_rss_mb(),
+        }
+
+    # --- Internals ---
+    async def _launch(self) -> PooledBrowser:
+        browser = await self._playwright.chromium.launch(**self.launch_options)
+        self.launches += 1
+        BROWSER_LAUNCHES.inc()
+        return PooledBrowser(browser)
+
+    async def _close_browser(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            print(f"Error closing pooled browser: {e}")
+
+    def _retire_if_over_memory(self):
+        """Retires the longest-lived browser when the browser tree uses too much memory."""
+        if not self.max_memory_mb:
+            return
+        rss = _process_tree_rss_mb()
+        if rss is None or rss <= self.max_memory_mb:
+            return
+        healthy = [b for b in self._browsers if b.healthy]
+        if healthy:
+            print(f"Browser pool is using {rss:.0f} MB, recycling one browser.")
+            max(healthy, key=lambda b: b.contexts_served).retired = True
+
+    async def _replace_unhealthy(self):
+        """Closes dead or retired idle browsers and tops the pool back up. Caller holds the lock."""
+        for pooled in list(self._browsers):
+            if pooled.healthy:
+                continue
+            # A retired browser keeps serving the contexts it already handed out
+            if pooled.browser.is_connected() and pooled.active_contexts > 0:
+                continue
+            print(f"Recycling pooled browser after {pooled.contexts_served} contexts.")
+            self._browsers.remove(pooled)
+            await self._close_browser(pooled)
+
+        healthy = sum(1 for b in self._browsers if b.healthy)
+        for _ in range(self.size - healthy):
+            self._browsers.append(await self._launch())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                async with self._lock:
+                    self._retire_if_over_memory()
+                    await self._replace_unhealthy()
+            except Exception as e:
+                print(f"Browser pool health check failed: {e}")
+
+
+# Create a single instance to be imported by your app
+browser_pool = BrowserPool(
+    size=settings.BROWSER_POOL_SIZE,
+    max_contexts=settings.BROWSER_MAX_CONTEXTS,
+    max_memory_mb=settings.BROWSER_MAX_MEMORY_MB,
+    health_check_interval=settings.BROWSER_HEALTH_CHECK_INTERVAL,
+    # No slow_mo: it delayed every call, reads included. Write actions are paced by utils.pacer.
+    launch_options={"headless": True},
+)
@@ -0,0 +1,105 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, Any
+from pymongo.errors import BulkWriteError
+from beanie.operators import In
+from config.settings import settings
+from models.comment_cache import CachedComment
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_content(content: str) -> str:
+    """Case and whitespace differences shouldn't produce a different comment."""
+    return _WHITESPACE.sub(" ", content).strip().lower()
+
+
+def make_cache_key(prompt: str, model: str, temperature: float, content: str) -> str:
+    # Temperatures are bucketed so 0.70 and 0.72 share entries
+    bucket = round(float(temperature or 0), 1)
+    raw = "\x1f".join([prompt, model, f"{bucket:.1f}", normalize_content(content)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CommentCache:
+    """
+    Two-tier cache of generated comments (including [SKIP] verdicts).
+
+    Lookups hit an in-memory LRU first and then the `comment_cache` collection,
+    where a TTL index expires old entries. A hit means no LLM call at all.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            try:
+                docs = await CachedComment.find(In(CachedComment.key, missing)).to_list()
+            except Exception as e:
+                print(f"Comment cache lookup failed: {e}")
+                docs = []
+            for doc in docs:
+                found[doc.key] = doc.comment
+                self._remember(doc.key, doc.comment)
+
+        misses = sum(1 for key in missing if key not in found)
+        self.hits += len(found)
+        self.misses += misses
+        return found
+
+    async def set_many(self, entries: Dict[str, str]):
+        if not entries:
+            return
+        for key, comment in entries.items():
+            self._remember(key, comment)
+        try:
+            await CachedComment.insert_many(
+                [CachedComment(key=key, comment=comment) for key, comment in entries.items()],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # Another run cached the same post first; anything else is worth a log line
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                print(f"Comment cache write failed: {e}")
+        except Exception as e:
+            print(f"Comment cache write failed: {e}")
+
+    async def purge(self) -> int:
+        """Empties both tiers. Returns how many stored entries were removed."""
+        self._memory.clear()
+        result = await CachedComment.find_all().delete()
+        return result.deleted_count if result else 0
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "stored_entries": await CachedComment.find_all().count(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, comment: str):
+        self._memory[key] = comment
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+
+# Create a single instance to be imported by your app
+comment_cache = CommentCache(settings.COMMENT_CACHE_SIZE)
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from typing import List, Dict, Optional, Union
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from pydantic import BaseModel, ValidationError
+from utils.comment_cache import CommentCache, make_cache_key
+from utils.metrics import RunMetrics, llm_span
+from utils.text_normalizer import compact_prompt, normalize_post_text
+from models.scraped_post import ScrapedPost
+
+SKIP = "[SKIP]"
+
+BATCH_INSTRUCTIONS = """
+    You will be given several posts at once. Handle each post independently, following the rules above.
+    Respond with ONLY a JSON array containing one object per post, in this exact shape:
+    [{"urn": "<the post's URN>", "comment": "<your comment, or [SKIP]>"}]
+    """
+
+
+class BatchComment(BaseModel):
+    urn: str
+    comment: str
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+def prompt_text(prompt: Union[str, List[BaseMessage]]) -> str:
+    """The text of a prompt, whether a string or a list of messages."""
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(m.content for m in prompt)
+
+
+def token_usage(prompt: Union[str, List[BaseMessage]], response) -> Dict[str, int]:
+    """Token counts the model reported for a request, or estimates when it reported none."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    content = response.content if isinstance(response.content, str) else ""
+    return {
+        "tokens_in": usage.get("input_tokens") or estimate_tokens(prompt_text(prompt)),
+        "tokens_out": usage.get("output_tokens") or estimate_tokens(content),
+    }
+
+
+def format_post(post: ScrapedPost, max_tokens: int = 0) -> str:
+    """The post as the model sees it: cleaned up and cut to about `max_tokens`."""
+    author = " ".join(post.author.split())
+    return f"Author: {author}\nContent: {normalize_post_text(post.content, max_tokens)}"
+
+
+class CommentGenerator:
+    """
+    Generates comments for posts, several posts per LLM request when possible.
+
+    A batch sends the system prompt once for K posts and expects a JSON list of
+    {urn, comment} entries back. Entries that are missing or malformed fall back
+    to a single-post request, so a bad batch response never loses a post.
+    With a `cache`, posts already answered for this prompt and model skip the LLM.
+
+    The system prompt is built once per generator (one run) and goes out as
+    a system message, so the model gets it as its system instruction rather
+    than as part of every post's text. Post text is normalized and cut to
+    `post_max_tokens` first; `stats` counts its tokens before and after.
+    """
+
+    def __init__(
+        self,
+        llm,
+        system_prompt: str,
+        max_batch_size: int = 8,
+        token_budget: int = 6000,
+        cache: Optional[CommentCache] = None,
+        metrics: Optional[RunMetrics] = None,
+        post_max_tokens: int = 0
+    ):
+        self.llm = llm
+        self.system_prompt = system_prompt
+        self.max_batch_size = max(1, max_batch_size)
+        self.token_budget = token_budget
+        self.cache = cache
+        self.metrics = metrics
+        self.post_max_tokens = post_max_tokens
+        self._system = SystemMessage(compact_prompt(system_prompt))
+        self._batch_system = SystemMessage(compact_prompt(f"{system_prompt}\n{BATCH_INSTRUCTIONS}"))
+        self.stats = {
+            "llm_requests": 0,
+            "batched_posts": 0,
+            "fallbacks": 0,
+            "cache_hits": 0,
+            "posts_sent": 0,
+            "post_tokens_raw": 0,
+            "post_tokens_sent": 0,
+        }
+
+    def cache_key(self, post: ScrapedPost) -> str:
+        return make_cache_key(
+            self.system_prompt,
+            getattr(self.llm, "model", ""),
+            getattr(self.llm, "temperature", 0),
+            post.content
+        )
+
+    def fits(self, posts: List[ScrapedPost]) -> bool:
+        """Whether these posts can go out as a single request."""
+        if len(posts) <= 1:
+            return True
+        if len(posts) > self.max_batch_size:
+            return False
+        tokens = sum(estimate_tokens(format_post(p, self.post_max_tokens)) for p in posts)
+        return tokens <= self.token_budget
+
+    async def generate(self, post: ScrapedPost) -> str:
+        messages = [self._system, HumanMessage(f"--- POST ---\n{format_post(post, self.post_max_tokens)}")]
+        self.stats["llm_requests"] += 1
+        with llm_span("comment", self.metrics) as span:
+            response = await self.llm.ainvoke(messages)
+            span.set(**token_usage(messages, response))
+        return response.content.strip()
+
+    async def generate_batch(self, posts: List[ScrapedPost]) -> List[str]:
+        """Returns one comment (or [SKIP]) per post, in the same order."""
+        if self.cache is None:
+            return await self._generate_uncached(posts)
+
+        keys = [self.cache_key(p) for p in posts]
+        cached = await self.cache.get_many(keys)
+        self.stats["cache_hits"] += sum(1 for k in keys if k in cached)
+
+        todo = [(k, p) for k, p in zip(keys, posts) if k not in cached]
+        if todo:
+            generated = await self._generate_uncached([p for _, p in todo])
+            fresh = {k: c for (k, _), c in zip(todo, generated)}
+            await self.cache.set_many(fresh)
+            cached.update(fresh)
+
+        return [cached[k] for k in keys]
+
+    async def _generate_uncached(self, posts: List[ScrapedPost]) -> List[str]:
+        self.stats["posts_sent"] += len(posts)
+        for post in posts:
+            self.stats["post_tokens_raw"] += estimate_tokens(f"Author: {post.author}\nContent: {post.content}")
+            self.stats["post_tokens_sent"] += estimate_tokens(format_post(post, self.post_max_tokens))
+
+        if len(posts) == 1:
+            return [await self.generate(posts[0])]
+
+        comments: Dict[str, str] = {}
+        try:
+            comments = await self._request_batch(posts)
+            self.stats["batched_posts"] += len(comments)
+        except Exception as e:
+            print(f"Batch comment generation failed, falling back to single posts: {e}")
+
+        missing = [p for p in posts if p.urn not in comments]
+        if missing:
+            self.stats["fallbacks"] += len(missing)
+            results = await asyncio.gather(*(self.generate(p) for p in missing))
+            comments.update({p.urn: c for p, c in zip(missing, results)})
+
+        return [comments[p.urn] for p in posts]
+
+    async def _request_batch(self, posts: List[ScrapedPost]) -> Dict[str, str]:
+        posts_text = "\n---\n".join(f"URN: {p.urn}\n{format_post(p, self.post_max_tokens)}" for p in posts)
+        messages = [self._batch_system, HumanMessage(f"--- POSTS ---\n{posts_text}")]
+        self.stats["llm_requests"] += 1
+        with llm_span("comment_batch", self.metrics) as span:
+            response = await self.llm.ainvoke(messages)
+            span.set(posts=len(posts), **token_usage(messages, response))
+        return self._parse_batch(response.content, {p.urn for p in posts})
+
+    @staticmethod
+    def _parse_batch(text: str, expected_urns: set) -> Dict[str, str]:
+        """Parses the model's JSON list, keeping only valid entries for URNs we asked about."""
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("No JSON list in batch response")
+
+        comments = {}
+        for raw in json.loads(text[start:end + 1]):
+            try:
+                entry = BatchComment.model_validate(raw)
+            except ValidationError:
+                continue
+            comment = entry.comment.strip()
+            if entry.urn in expected_urns and comment:
+                comments[entry.urn] = comment
+        return comments
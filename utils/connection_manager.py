@@ -1,29 +1,81 @@
+import asyncio
 from fastapi import WebSocket
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional
+from config.settings import settings
+from utils.event_log import event_log
+
+class _Client:
+    """A connected dashboard: its run subscription, outbound queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, run_id: Optional[str], queue_size: int):
+        self.websocket = websocket
+        self.run_id = run_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.sender: Optional[asyncio.Task] = None
 
 class ConnectionManager:
-    def __init__(self):
-        # Note: This simple manager broadcasts to *all* clients.
-        # For a multi-user app, you'd use a Dict[str, WebSocket]
-        # to send messages only to a specific user.
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, queue_size: int = 100):
+        # Each client subscribes to one run ID (or to every run when it gives none)
+        # and has its own bounded queue + sender task, so a slow client
+        # only ever slows itself down, never the agent or the other clients.
+        self.queue_size = queue_size
+        self.active_connections: Dict[WebSocket, _Client] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, run_id: Optional[str] = None, last_seq: int = 0):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        print("A client connected.")
+        # A run subscriber first gets the buffered events it missed (seq > last_seq)
+        missed = event_log.replay(run_id, last_seq) if run_id else []
+        client = _Client(websocket, run_id, self.queue_size + len(missed))
+        for event in missed:
+            client.queue.put_nowait(event)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self.active_connections[websocket] = client
+        print(f"A client connected (run: {run_id or 'all'}, replayed {len(missed)} events).")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        if client.sender:
+            client.sender.cancel()
         print("A client disconnected.")
 
-    async def broadcast(self, data: Dict[str, Any]):
-        """Sends a JSON message to all connected clients."""
-        for connection in self.active_connections:
+    async def broadcast(self, data: Dict[str, Any], run_id: Optional[str] = None):
+        """
+        Queues a JSON message for every client subscribed to `run_id`
+        (plus clients watching all runs). Never waits on a socket.
+        """
+        if run_id:
+            # Stamps run_id + seq and keeps the event for replay
+            data = event_log.record(run_id, data)
+
+        for websocket, client in list(self.active_connections.items()):
+            if client.run_id and client.run_id != run_id:
+                continue
             try:
-                await connection.send_json(data)
+                client.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # The client can't keep up; drop it rather than buffer without limit
+                print("Dropping a websocket client that fell too far behind.")
+                self.disconnect(websocket)
+                asyncio.create_task(self._close(websocket))
+
+    async def _send_loop(self, client: _Client):
+        while True:
+            data = await client.queue.get()
+            try:
+                await client.websocket.send_json(data)
             except Exception as e:
                 print(f"Error broadcasting to a websocket: {e}")
+                self.disconnect(client.websocket)
+                return
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            # 1013: "try again later"; the dashboard can reconnect
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
 # Create a single instance to be imported by your app
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(queue_size=settings.WS_CLIENT_QUEUE_SIZE)
@@ -0,0 +1,111 @@
+import json
+import os
+import re
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, TextIO
+from config.settings import settings
+
+_SAFE_RUN_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class RunEventLog:
+    """
+    Sequence-numbered history of every run's events.
+
+    Each event gets a per-run `seq`, starting at 1. The latest `buffer_size`
+    events of the latest `max_runs` runs are kept in memory, so reconnecting
+    dashboards can resume from a `last_seq` cursor. Finished runs are evicted
+    first; a run still in progress only ever loses buffered events, never its
+    sequence counter, so its seq numbers don't go backwards. With a `log_dir`, every
+    event is also appended to <log_dir>/<run_id>.jsonl, which keeps the full
+    history of a run after the server restarts.
+    """
+
+    def __init__(self, buffer_size: int, max_runs: int, log_dir: Optional[str] = None):
+        self.buffer_size = buffer_size
+        self.max_runs = max_runs
+        self.log_dir = log_dir
+        self._buffers: "OrderedDict[str, deque]" = OrderedDict()
+        self._seq: Dict[str, int] = {}
+        self._finished: set = set()
+        self._files: Dict[str, TextIO] = {}
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+    def record(self, run_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Stamps the event with its run ID and sequence number and stores it."""
+        if run_id not in self._buffers:
+            self._buffers[run_id] = deque(maxlen=self.buffer_size)
+            self._evict()
+
+        self._seq[run_id] = self._seq.get(run_id, 0) + 1
+        event = {**data, "run_id": run_id, "seq": self._seq[run_id]}
+        self._buffers[run_id].append(event)
+        self._append_to_disk(run_id, event)
+        return event
+
+    def replay(self, run_id: str, after_seq: int = 0) -> List[Dict[str, Any]]:
+        """Buffered events of a run with seq > after_seq."""
+        return [e for e in self._buffers.get(run_id, ()) if e["seq"] > after_seq]
+
+    def history(self, run_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Full event history of a run (from disk when logged there), or None if unknown."""
+        path = self._path(run_id)
+        if path and os.path.exists(path):
+            if run_id in self._files:
+                self._files[run_id].flush()
+            with open(path, "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        if run_id in self._buffers:
+            return list(self._buffers[run_id])
+        return None
+
+    def finish(self, run_id: str):
+        """Closes the run's log file; its events stay replayable from memory until it's evicted."""
+        self._close_file(run_id)
+        if run_id in self._buffers:
+            self._finished.add(run_id)
+        else:
+            self._seq.pop(run_id, None)
+
+    def _evict(self):
+        """Drops the oldest finished run while over `max_runs`; with none finished, the oldest run's buffered events."""
+        while len(self._buffers) > self.max_runs:
+            finished = next((r for r in self._buffers if r in self._finished), None)
+            if finished is not None:
+                del self._buffers[finished]
+                self._seq.pop(finished, None)
+                self._finished.discard(finished)
+                self._close_file(finished)
+            else:
+                # Every buffered run is still active: keep its seq counter, only its events go
+                self._buffers.popitem(last=False)
+
+    def _path(self, run_id: str) -> Optional[str]:
+        if not self.log_dir or not _SAFE_RUN_ID.match(run_id):
+            return None
+        return os.path.join(self.log_dir, f"{run_id}.jsonl")
+
+    def _append_to_disk(self, run_id: str, event: Dict[str, Any]):
+        path = self._path(run_id)
+        if not path:
+            return
+        try:
+            if run_id not in self._files:
+                self._files[run_id] = open(path, "a", encoding="utf-8")
+            self._files[run_id].write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+        except OSError as e:
+            print(f"Could not append to the event log of run {run_id}: {e}")
+
+    def _close_file(self, run_id: str):
+        f = self._files.pop(run_id, None)
+        if f:
+            f.close()
+
+
+# Create a single instance to be imported by your app
+event_log = RunEventLog(
+    buffer_size=settings.EVENT_BUFFER_SIZE,
+    max_runs=settings.EVENT_BUFFER_MAX_RUNS,
+    log_dir=settings.EVENT_LOG_DIR or None
+)
@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import itertools
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Any
+from beanie.operators import In, Set
+from config.settings import settings
+from models.agent_job import AgentJob
+from models.api_models import AgentStartRequest
+from utils.accounts import account_key
+from utils.metrics import RUNS
+from controllers import agent_controller
+
+FINISHED_STATUSES = {"succeeded", "failed", "cancelled", "timed_out"}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobScheduler:
+    """
+    In-process scheduler for agent runs.
+
+    Jobs wait in a priority queue (FIFO within a priority) and are started
+    only while fewer than `max_concurrent` runs are active in total and fewer
+    than `per_account` for the job's LinkedIn account. Every job has an
+    AgentJob record in Mongo that tracks its status and final results.
+    """
+
+    def __init__(self, max_concurrent: int, per_account: int, timeout: float, max_queued: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_account = max(1, per_account)
+        self.timeout = timeout
+        self.max_queued = max_queued
+
+        self._queue: List[Tuple[int, int, str]] = [] # (-priority, arrival, job_id)
+        self._arrivals = itertools.count()
+        self._pending: Dict[str, Tuple[AgentJob, AgentStartRequest]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._account_running: Counter = Counter()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._dispatcher is not None:
+            return
+        # Jobs from a previous process can't resume on their own (their cookies are gone)
+        await AgentJob.find(In(AgentJob.status, ["queued", "running"])).update(
+            Set({AgentJob.status: "failed", AgentJob.error: "Interrupted by a server restart.", AgentJob.finished_at: datetime.utcnow()})
+        )
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def close(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for task in list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    async def submit(self, request: AgentStartRequest, priority: int = 0, job_id: Optional[str] = None) -> AgentJob:
+        if len(self._pending) >= self.max_queued:
+            raise QueueFullError(f"Too many queued runs ({len(self._pending)}). Try again later.")
+
+        job = AgentJob(
+            job_id=job_id or uuid.uuid4().hex,
+            priority=priority,
+            account_key=account_key(request.cookie_json),
+            auto_comment=request.auto_comment,
+            auto_like=request.auto_like,
+            max_posts=request.max_posts_to_process,
+            resumed_from=request.resume_from
+        )
+        await job.insert()
+
+        self._pending[job.job_id] = (job, request)
+        heapq.heappush(self._queue, (-priority, next(self._arrivals), job.job_id))
+        self._wakeup.set()
+        if self._dispatcher is None:
+            await self.start()
+        return job
+
+    async def get(self, job_id: str) -> Optional[AgentJob]:
+        return await AgentJob.find_one(AgentJob.job_id == job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancels a queued or running job. Returns False if it already finished (or doesn't exist)."""
+        if job_id in self._pending:
+            job, _ = self._pending.pop(job_id)
+            await self._finish(job, "cancelled", error="Cancelled before it started.")
+            return True
+        if job_id in self._running:
+            self._running[job_id].cancel()
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._pending),
+            "running": len(self._running),
+            "max_concurrent": self.max_concurrent,
+        }
+
+    # --- Internals ---
+    async def _dispatch_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            self._dispatch()
+
+    def _dispatch(self):
+        """Starts queued jobs in priority order while there is capacity."""
+        waiting = []
+        while self._queue and len(self._running) < self.max_concurrent:
+            entry = heapq.heappop(self._queue)
+            job_id = entry[2]
+            if job_id not in self._pending:
+                continue # Cancelled while queued
+            job, request = self._pending[job_id]
+            if self._account_running[job.account_key] >= self.per_account:
+                waiting.append(entry) # Its account is busy; let other accounts go first
+                continue
+            del self._pending[job_id]
+            self._account_running[job.account_key] += 1
+            self._running[job_id] = asyncio.create_task(self._run(job, request))
+
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+
+    async def _run(self, job: AgentJob, request: AgentStartRequest):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        await job.save()
+        try:
+            final_state = await asyncio.wait_for(
+                agent_controller.run_linkedin_agent(request, run_id=job.job_id),
+                timeout=self.timeout
+            )
+            job.summary = final_state.get("summary")
+            job.logs = final_state.get("final_logs", [])
+            job.run_stats = final_state.get("run_stats", {})
+            if final_state.get("error"):
+                await self._finish(job, "failed", error=final_state["error"])
+            else:
+                await self._finish(job, "succeeded")
+        except asyncio.TimeoutError:
+            await self._finish(job, "timed_out", error=f"Run exceeded {self.timeout:.0f}s.")
+        except asyncio.CancelledError:
+            await self._finish(job, "cancelled", error="Cancelled while running.")
+        except Exception as e:
+            print(f"Job {job.job_id} failed: {e}")
+            await self._finish(job, "failed", error=str(e))
+        finally:
+            self._running.pop(job.job_id, None)
+            self._account_running[job.account_key] -= 1
+            self._wakeup.set()
+
+    async def _finish(self, job: AgentJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        RUNS.inc(status=status)
+        try:
+            await job.save()
+        except Exception as e:
+            print(f"Could not save job {job.job_id}: {e}")
+
+
+# Create a single instance to be imported by your app
+job_scheduler = JobScheduler(
+    max_concurrent=settings.MAX_CONCURRENT_RUNS,
+    per_account=settings.MAX_RUNS_PER_ACCOUNT,
+    timeout=settings.JOB_TIMEOUT_SECONDS,
+    max_queued=settings.MAX_QUEUED_JOBS
+)
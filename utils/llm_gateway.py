@@ -0,0 +1,282 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config.settings import settings
+from utils.metrics import LLM_ATTEMPT_SECONDS, LLM_RETRIES, LLM_FAILURES, LLM_HEDGES
+
+# Transient server-side conditions; anything else (bad request, auth, parsing) fails at once
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "ConnectError", "ReadTimeout",
+}
+RETRYABLE_MARKERS = ("429", "500", "502", "503", "504", "RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "overloaded")
+
+
+class LLMTimeoutError(TimeoutError):
+    pass
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def error_reason(error: BaseException) -> str:
+    """Short label for metrics: the status code when there is one, else the error type."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(code, int):
+        return str(code)
+    return type(error).__name__
+
+
+def is_retryable(error: BaseException) -> bool:
+    # The Gemini client wraps API errors in its own type, so the cause chain is checked too
+    while error is not None:
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        if type(error).__name__ in RETRYABLE_ERRORS:
+            return True
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+            return True
+        if any(marker in str(error) for marker in RETRYABLE_MARKERS):
+            return True
+        error = error.__cause__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed attempts; while open, calls
+    fail at once instead of piling onto a struggling API. After `reset_after`
+    seconds calls are let through again: one success closes the circuit,
+    one failure opens it for another period.
+    """
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = max(1, threshold)
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.reset_after else "half_open"
+
+    def check(self):
+        if self.state == "open":
+            remaining = self.reset_after - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"LLM circuit is open after {self.failures} failed calls; retrying in {remaining:.1f}s.")
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self):
+        self.failures += 1
+        # Past the threshold, every failure (including a failed trial call) starts a new open period
+        if self.failures >= self.threshold:
+            if self.opened_at is None:
+                print(f"LLM circuit opened after {self.failures} consecutive failures.")
+            self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """
+    The one way the agent talks to the chat model.
+
+    Every call takes a slot of a process-wide semaphore, has a deadline,
+    and is retried with exponential backoff and full jitter when the error
+    is transient (429s, 5xx, timeouts). A circuit breaker stops calls while
+    the API keeps failing. With `hedge_after`, a call still running after
+    that many seconds gets a duplicate request and the first answer wins.
+    Exposes `model` and `temperature`, so it drops in for the model itself.
+    Given a `factory` instead of a model, the model is only built on first use.
+    """
+
+    def __init__(
+        self,
+        llm,
+        max_concurrency: int,
+        timeout: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        breaker: CircuitBreaker,
+        hedge_after: float = 0.0,
+        factory: Optional[Callable[[], Any]] = None
+    ):
+        self._llm = llm
+        self._factory = factory
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.hedge_after = hedge_after
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = self._factory()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+
+    @property
+    def model(self) -> str:
+        return getattr(self.llm, "model", "")
+
+    @property
+    def temperature(self) -> float:
+        return getattr(self.llm, "temperature", 0)
+
+    async def ainvoke(self, prompt, **kwargs):
+        return await self._with_retries(lambda: self.llm.ainvoke(prompt, **kwargs))
+
+    async def astream(self, prompt, **kwargs):
+        """
+        Streams the answer. Retries only until the first chunk arrives; after
+        that a failure is raised, since the caller already used the partial answer.
+        Each chunk has to arrive within the deadline.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.check()
+            started = False
+            try:
+                async with self._slots:
+                    self.in_flight += 1
+                    try:
+                        stream = self.llm.astream(prompt, **kwargs).__aiter__()
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+                            except StopAsyncIteration:
+                                break
+                            except asyncio.TimeoutError:
+                                raise LLMTimeoutError(f"LLM stream stalled for {self.timeout:.0f}s.")
+                            started = True
+                            yield chunk
+                    finally:
+                        self.in_flight -= 1
+                self.breaker.success()
+                return
+            except Exception as e:
+                if started:
+                    raise
+                await self._after_failure(e, attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "circuit": self.breaker.state,
+        }
+
+    # --- Internals ---
+    async def _with_retries(self, make_call: Callable[[], Awaitable[Any]]):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.check()
+            try:
+                result = await self._attempt(make_call)
+            except Exception as e:
+                await self._after_failure(e, attempt)
+            else:
+                self.breaker.success()
+                return result
+
+    async def _after_failure(self, error: Exception, attempt: int):
+        """Re-raises `error` unless it's worth another attempt; then waits out the backoff."""
+        reason = error_reason(error)
+        if not is_retryable(error):
+            LLM_FAILURES.inc(reason=reason)
+            raise error
+        self.breaker.failure()
+        if attempt >= self.max_retries:
+            LLM_FAILURES.inc(reason=reason)
+            raise error
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        LLM_RETRIES.inc(reason=reason)
+        print(f"LLM call failed ({reason}: {error}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+    async def _attempt(self, make_call: Callable[[], Awaitable[Any]]):
+        """One call (plus its hedge, if any) under a concurrency slot and a deadline."""
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            self.in_flight += 1
+            started = loop.time()
+            deadline = started + self.timeout
+            tasks = set()
+            hedged = not self.hedge_after
+            outcome = "error"
+            try:
+                # Inside the try: building the call can raise (e.g. the model factory)
+                tasks.add(asyncio.ensure_future(make_call()))
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        outcome = "timeout"
+                        raise LLMTimeoutError(f"LLM call exceeded {self.timeout:.0f}s.")
+                    done, _ = await asyncio.wait(
+                        tasks,
+                        timeout=remaining if hedged else min(remaining, self.hedge_after),
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    error = None
+                    for task in done:
+                        tasks.discard(task)
+                        if task.exception() is None:
+                            outcome = "ok"
+                            return task.result()
+                        error = task.exception()
+                    if error is not None and not tasks:
+                        raise error
+                    if not done and not hedged:
+                        # Slow tail: race a second request against the first
+                        hedged = True
+                        LLM_HEDGES.inc()
+                        tasks.add(asyncio.ensure_future(make_call()))
+            finally:
+                for task in tasks:
+                    task.cancel()
+                self.in_flight -= 1
+                LLM_ATTEMPT_SECONDS.observe(loop.time() - started, outcome=outcome)
+
+
+def gateway_for(llm=None, factory: Optional[Callable[[], Any]] = None) -> LLMGateway:
+    """Wraps a chat model (or a function that builds one) in a gateway configured from settings."""
+    return LLMGateway(
+        llm,
+        factory=factory,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        max_retries=settings.LLM_MAX_RETRIES,
+        backoff_base=settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+        breaker=CircuitBreaker(settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS),
+        hedge_after=settings.LLM_HEDGE_AFTER_SECONDS
+    )
+
+
+def _gemini():
+    # langchain_google_genai takes most of a second to import; only the first LLM call pays for it
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        temperature=0.7,
+        google_api_key=settings.GEMINI_API_KEY,
+        max_retries=1 # A single attempt: retries and backoff are the gateway's job
+    )
+
+
+# Create a single instance to be imported by your app
+llm_gateway = gateway_for(factory=_gemini)
@@ -0,0 +1,137 @@
+import asyncio
+import random
+from typing import List, Optional
+from pymongo.errors import BulkWriteError
+from config.settings import settings
+from models.comment_log import CommentLog
+from utils.metrics import span, LOG_DUPLICATES
+from utils.rollups import rollup_store
+
+
+class LogSink:
+    """
+    Write-behind buffer for CommentLog documents.
+
+    `put()` returns as soon as the document is buffered; a background task
+    writes buffered logs with `insert_many` once `batch_size` are waiting or
+    `flush_interval` seconds have passed. The buffer is bounded, so `put()`
+    only waits (backpressure) when the database falls far behind.
+    Failed writes are retried with backoff before they are dropped.
+    Every log that gets written is also added to the daily rollups.
+    A log the account already has for the same post URN is dropped (and
+    counted); one that only shares a content hash is written without it.
+    """
+
+    def __init__(self, max_buffer: int, batch_size: int, flush_interval: float, max_retries: int = 3):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue: asyncio.Queue = asyncio.Queue(max(1, max_buffer))
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.duplicates = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, log_entry: CommentLog):
+        self.start()
+        await self._queue.put(log_entry)
+
+    async def flush(self):
+        """Waits until every log buffered so far has been written (or dropped)."""
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        print(f"Log sink closed ({self.written} written, {self.duplicates} duplicates, {self.dropped} dropped).")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[CommentLog]):
+        attempt = 0
+        while True:
+            try:
+                with span("db_write"):
+                    await CommentLog.insert_many(batch, ordered=False)
+                self.written += len(batch)
+                await self._roll_up(batch)
+                return
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                self.written += len(batch) - len(errors)
+                rejected = {err["index"] for err in errors}
+                await self._roll_up([doc for i, doc in enumerate(batch) if i not in rejected])
+                failed, rekeyed = set(), set()
+                for err in errors:
+                    doc = batch[err["index"]]
+                    if err.get("code") != 11000:
+                        failed.add(err["index"])
+                    elif "post_urn" in (err.get("keyPattern") or err.get("errmsg", "")):
+                        # The account already logged this very post (e.g. a concurrent run of the same account)
+                        self.duplicates += 1
+                        LOG_DUPLICATES.inc()
+                        print(f"Not logging {doc.post_urn} again: already logged for account {doc.account_key}.")
+                    else:
+                        # Another post with the same text: a real action, kept without the content hash
+                        doc.content_hash = None
+                        rekeyed.add(err["index"])
+                batch = [doc for i, doc in enumerate(batch) if i in failed or i in rekeyed]
+                if not batch:
+                    return
+                error = e
+                if not failed:
+                    # Only re-keyed logs are left; write them right away (they can't collide on the hash again)
+                    continue
+            except Exception as e:
+                error = e
+
+            if attempt >= self.max_retries:
+                break
+            delay = (2 ** attempt) * 0.5 + random.uniform(0, 0.5)
+            print(f"CommentLog flush failed ({error}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        self.dropped += len(batch)
+        print(f"Dropping {len(batch)} CommentLog entries after {self.max_retries + 1} failed attempts: {error}")
+
+    async def _roll_up(self, written: List[CommentLog]):
+        try:
+            with span("db_rollup"):
+                await rollup_store.apply(written)
+        except Exception as e:
+            # The logs are safe; only the analytics totals drift (POST /admin/rollups/rebuild fixes them)
+            print(f"Could not update daily rollups: {e}")
+
+
+# Create a single instance to be imported by your app
+log_sink = LogSink(
+    max_buffer=settings.LOG_SINK_MAX_BUFFER,
+    batch_size=settings.LOG_SINK_BATCH_SIZE,
+    flush_interval=settings.LOG_SINK_FLUSH_INTERVAL
+)
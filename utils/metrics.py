@@ -0,0 +1,251 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# --- Metric types (Prometheus text format) ---
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down. With `function`, it's read when the metrics are scraped."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), function: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labelnames)
+        self.function = function
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def _samples(self) -> List[str]:
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception as e:
+                print(f"Could not read gauge {self.name}: {e}")
+                return []
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self._counts.setdefault(key, [0] * len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        # Registering the same name twice returns the first metric (safe on module reloads)
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge(name, help, labelnames, function))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Create a single instance to be imported by your app
+registry = MetricsRegistry()
+
+# --- App metrics ---
+RUNS = registry.counter("agent_runs_total", "Agent runs by final status.", ["status"])
+POSTS = registry.counter("agent_posts_total", "Feed posts by outcome.", ["outcome"])
+STAGE_SECONDS = registry.histogram("agent_stage_seconds", "Duration of agent stages (nodes, navigation, scrolls, actions, DB writes, pauses).", ["stage"])
+LLM_SECONDS = registry.histogram("agent_llm_request_seconds", "LLM request latency.", ["purpose"])
+LLM_TOKENS = registry.counter("agent_llm_tokens_total", "LLM tokens (estimated when the model reports none).", ["direction"])
+LLM_ATTEMPT_SECONDS = registry.histogram("agent_llm_attempt_seconds", "Single LLM request attempts, retries and hedges included.", ["outcome"])
+LLM_RETRIES = registry.counter("agent_llm_retries_total", "LLM requests retried after a transient error.", ["reason"])
+LLM_FAILURES = registry.counter("agent_llm_failures_total", "LLM requests that failed for good.", ["reason"])
+LLM_HEDGES = registry.counter("agent_llm_hedged_requests_total", "Duplicate requests sent for slow LLM calls.")
+LOG_DUPLICATES = registry.counter("agent_log_duplicates_total", "CommentLogs not written because the account had already logged the post.")
+BROWSER_LAUNCHES = registry.counter("agent_browser_launches_total", "Chromium launches by the browser pool.")
+
+
+# --- Timing spans ---
+class Span:
+    """One timed stage. Numeric attributes set on it (e.g. tokens) are summed per run."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.attrs: Dict[str, Any] = {}
+        self.seconds = 0.0
+        self.failed = False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class RunMetrics:
+    """Per-run aggregates of every span recorded while the run was active."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, span: Span):
+        stage = self.stages.setdefault(span.stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+        ms = span.seconds * 1000
+        stage["count"] += 1
+        stage["total_ms"] += ms
+        stage["max_ms"] = max(stage["max_ms"], ms)
+        if span.failed:
+            stage["errors"] += 1
+        for key, value in span.attrs.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stage[key] = stage.get(key, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        stages = {}
+        for name, stage in self.stages.items():
+            stages[name] = {
+                **stage,
+                "total_ms": round(stage["total_ms"], 1),
+                "max_ms": round(stage["max_ms"], 1),
+                "avg_ms": round(stage["total_ms"] / stage["count"], 1),
+            }
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "stages": stages,
+        }
+
+
+@contextmanager
+def span(stage: str, run: Optional[RunMetrics] = None) -> Iterator[Span]:
+    """Times a block into the stage histogram and, with a run, into its aggregates."""
+    current = Span(stage)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.failed = True
+        raise
+    finally:
+        current.seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(current.seconds, stage=stage)
+        if run is not None:
+            run.record(current)
+
+
+@contextmanager
+def llm_span(purpose: str, run: Optional[RunMetrics] = None) -> Iterator[Span]:
+    """Times one LLM request. Callers set tokens_in / tokens_out on the span."""
+    current = None
+    started = time.perf_counter()
+    try:
+        with span(f"llm_{purpose}", run) as current:
+            yield current
+    finally:
+        LLM_SECONDS.observe(time.perf_counter() - started, purpose=purpose)
+        if current is not None:
+            LLM_TOKENS.inc(current.attrs.get("tokens_in", 0), direction="input")
+            LLM_TOKENS.inc(current.attrs.get("tokens_out", 0), direction="output")
+
+
+# --- Active runs ---
+_runs: Dict[str, RunMetrics] = {}
+
+
+def start_run(run_id: str) -> RunMetrics:
+    _runs[run_id] = RunMetrics(run_id)
+    return _runs[run_id]
+
+
+def for_run(run_id: Optional[str]) -> Optional[RunMetrics]:
+    return _runs.get(run_id) if run_id else None
+
+
+def finish_run(run_id: str) -> Optional[Dict[str, Any]]:
+    run = _runs.pop(run_id, None)
+    return run.summary() if run else None
@@ -0,0 +1,210 @@
+import re
+from typing import List, Dict, Any, Optional
+import numpy as np
+import xxhash
+from pydantic import BaseModel
+from models.post_fingerprint import PostFingerprint
+from models.scraped_post import ScrapedPost
+from utils.comment_cache import normalize_content
+
+_TOKEN_RE = re.compile(r"\w+")
+_BITS = np.arange(64, dtype=np.uint64)
+# Short posts only get a shingle-containment check against posts this close (a cheap pre-filter)
+_SHORT_CANDIDATE_DISTANCE = 24
+
+
+class FingerprintKey(BaseModel):
+    post_urn: str
+    simhash: int
+    shingles: Optional[List[int]] = None
+
+
+def _signed(h: int) -> int:
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Overlapping word n-grams of the normalized text."""
+    tokens = _TOKEN_RE.findall(normalize_content(text))
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def shingle_hashes(text: str, shingle_size: int = 3) -> List[int]:
+    return [xxhash.xxh64_intdigest(s) for s in shingles(text, shingle_size)]
+
+
+def simhash_batch(texts: List[str], shingle_size: int = 3) -> np.ndarray:
+    """64-bit SimHash of every text, computed for the whole batch at once (uint64 array)."""
+    return simhash_of_hashes([shingle_hashes(t, shingle_size) for t in texts])
+
+
+def simhash_of_hashes(hashed: List[List[int]]) -> np.ndarray:
+    counts = np.array([len(h) for h in hashed], dtype=np.int64)
+    flat = np.fromiter((h for row in hashed for h in row), dtype=np.uint64, count=int(counts.sum()))
+
+    # Each shingle votes +1/-1 on each of the 64 bits; a bit is set where the votes are positive
+    votes = ((flat[:, None] >> _BITS) & np.uint64(1)).astype(np.int32) * 2 - 1
+    totals = np.zeros((len(hashed), 64), dtype=np.int32)
+    nonempty = counts > 0
+    if nonempty.any():
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        totals[nonempty] = np.add.reduceat(votes, starts, axis=0)
+    return np.bitwise_or.reduce((totals > 0).astype(np.uint64) << _BITS, axis=1)
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise bit distances between two fingerprint arrays, shape (len(a), len(b))."""
+    return np.bitwise_count(a[:, None] ^ b[None, :])
+
+
+def containment(a: frozenset, b: frozenset) -> float:
+    """Share of the smaller shingle set that is also in the other one."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+class NearDuplicateDetector:
+    """
+    Collapses reshares, reposts and lightly edited copies of a post.
+
+    Every post gets a SimHash of its word shingles; posts within
+    `max_distance` bits of a post seen earlier in the run, or of one handled
+    in a recent run of the same account (the `post_fingerprints` collection),
+    are dropped before they cost an LLM call or an action. One detector lives
+    for one run.
+
+    On short posts (under `short_shingles` shingles) one added phrase moves
+    the SimHash as far as an unrelated post, so those are also compared by
+    shingle containment: a short post is a duplicate of an earlier short
+    post when `min_containment` of the smaller shingle set is in the other.
+    """
+
+    def __init__(
+        self,
+        max_distance: int,
+        min_tokens: int,
+        short_shingles: int = 0,
+        min_containment: float = 1.0,
+        account_key: Optional[str] = None,
+        known: Optional[List[FingerprintKey]] = None
+    ):
+        self.account_key = account_key
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+        self.short_shingles = short_shingles
+        self.min_containment = min_containment
+        known = known or []
+        self._urns: List[str] = [k.post_urn for k in known]
+        self._sets: List[Optional[frozenset]] = [frozenset(k.shingles) if k.shingles else None for k in known]
+        self._earlier_runs = len(self._urns)
+        self._fingerprints = np.array([k.simhash for k in known], dtype=np.int64).view(np.uint64)
+        self._by_urn: Dict[str, int] = {}
+        self._handled: List[str] = []
+        self.clusters: Dict[str, List[str]] = {}
+
+    @classmethod
+    async def load(cls, index_size: int, account_key: str, **kwargs) -> "NearDuplicateDetector":
+        """A detector primed with the account's most recent persisted fingerprints."""
+        try:
+            known = await PostFingerprint.find(PostFingerprint.account_key == account_key) \
+                .sort(-PostFingerprint.created_at) \
+                .limit(index_size) \
+                .project(FingerprintKey) \
+                .to_list()
+        except Exception as e:
+            print(f"Could not load post fingerprints: {e}")
+            known = []
+        return cls(account_key=account_key, known=known, **kwargs)
+
+    def check(self, posts: List[ScrapedPost]) -> List[Optional[str]]:
+        """For each post, the URN of the earlier post it duplicates, or None if it's new."""
+        results: List[Optional[str]] = [None] * len(posts)
+        candidates = [i for i, p in enumerate(posts) if len(_TOKEN_RE.findall(p.content)) >= self.min_tokens]
+        if not candidates:
+            return results
+
+        hashed = [shingle_hashes(posts[i].content) for i in candidates]
+        fingerprints = simhash_of_hashes(hashed)
+        sets = [frozenset(_signed(h) for h in row) if len(row) < self.short_shingles else None for row in hashed]
+        # Against everything seen before this batch, and within the batch itself
+        to_known = hamming(fingerprints, self._fingerprints) if len(self._fingerprints) else None
+        to_batch = hamming(fingerprints, fingerprints)
+
+        accepted = []
+        for row, i in enumerate(candidates):
+            original = None
+            if to_known is not None and to_known[row].min() <= self.max_distance:
+                original = self._urns[int(to_known[row].argmin())]
+            else:
+                for other in accepted:
+                    if to_batch[row, other] <= self.max_distance:
+                        original = posts[candidates[other]].urn
+                        break
+            if original is None and sets[row] is not None:
+                original = self._short_original(sets[row], to_known[row] if to_known is not None else None)
+                if original is None:
+                    for other in accepted:
+                        if self._contains(sets[row], sets[other], to_batch[row, other]):
+                            original = posts[candidates[other]].urn
+                            break
+            if original is None:
+                accepted.append(row)
+            else:
+                results[i] = original
+                self.clusters.setdefault(original, []).append(posts[i].urn)
+
+        for row in accepted:
+            self._by_urn[posts[candidates[row]].urn] = len(self._urns)
+            self._urns.append(posts[candidates[row]].urn)
+            self._sets.append(sets[row])
+        self._fingerprints = np.concatenate([self._fingerprints, fingerprints[accepted]])
+        return results
+
+    def _contains(self, a: frozenset, b: Optional[frozenset], distance: int) -> bool:
+        return b is not None and distance <= _SHORT_CANDIDATE_DISTANCE and containment(a, b) >= self.min_containment
+
+    def _short_original(self, shingle_set: frozenset, distances: Optional[np.ndarray]) -> Optional[str]:
+        """The earlier short post `shingle_set` is contained in (or contains), if any."""
+        if distances is None:
+            return None
+        for j in np.flatnonzero(distances <= _SHORT_CANDIDATE_DISTANCE):
+            if self._contains(shingle_set, self._sets[j], distances[j]):
+                return self._urns[j]
+        return None
+
+    def handled(self, urn: str):
+        """The post was logged; its fingerprint is kept for later runs."""
+        if urn in self._by_urn:
+            self._handled.append(urn)
+
+    async def save(self):
+        if not self._handled:
+            return
+        docs = [
+            PostFingerprint(
+                account_key=self.account_key,
+                post_urn=urn,
+                simhash=int(self._fingerprints[self._by_urn[urn]:self._by_urn[urn] + 1].view(np.int64)[0]),
+                shingles=sorted(self._sets[self._by_urn[urn]]) if self._sets[self._by_urn[urn]] else None
+            )
+            for urn in self._handled
+        ]
+        self._handled = []
+        try:
+            await PostFingerprint.insert_many(docs)
+        except Exception as e:
+            print(f"Could not save post fingerprints: {e}")
+
+    def report(self) -> List[Dict[str, Any]]:
+        """The collapsed clusters, for the run stats."""
+        return [
+            {
+                "original": original,
+                "duplicates": duplicates,
+                "earlier_run": self._urns.index(original) < self._earlier_runs,
+            }
+            for original, duplicates in self.clusters.items()
+        ]
@@ -0,0 +1,108 @@
+import asyncio
+import random
+import time
+from typing import Dict, Tuple, Optional
+from config.settings import settings
+
+# Per profile: sustained rate and burst per write action, a cap on all actions
+# together, random extra delay before each action, and the human-like pauses
+# between the steps of a comment (open box -> type -> submit).
+PACING_PROFILES: Dict[str, Dict] = {
+    "cautious": {
+        "like": {"per_hour": 60, "burst": 1},
+        "comment": {"per_hour": 30, "burst": 1},
+        "any": {"per_hour": 75, "burst": 1},
+        "jitter": (2.0, 6.0),
+        "step": (1.5, 3.5),
+    },
+    "normal": {
+        "like": {"per_hour": 120, "burst": 2},
+        "comment": {"per_hour": 90, "burst": 2},
+        "any": {"per_hour": 150, "burst": 2},
+        "jitter": (1.0, 4.0),
+        "step": (1.0, 2.5),
+    },
+    "fast": {
+        "like": {"per_hour": 240, "burst": 3},
+        "comment": {"per_hour": 150, "burst": 3},
+        "any": {"per_hour": 300, "burst": 3},
+        "jitter": (0.5, 2.0),
+        "step": (0.5, 1.5),
+    },
+    # No limits and no pauses: for benchmarks and local testing only
+    "off": None,
+}
+
+
+class TokenBucket:
+    """
+    Classic token bucket that hands out reservations: a caller that finds it
+    empty still takes a token (the balance goes negative) and is told how long
+    to wait, so concurrent callers queue up fairly without holding a lock.
+    """
+
+    def __init__(self, per_hour: float, burst: int):
+        self.rate = per_hour / 3600.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Takes one token. Returns how many seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class ActionPacer:
+    """
+    Paces LinkedIn write actions (likes, comments) per account.
+
+    Each account has a bucket per action type plus one for all actions, shared
+    by every run in this process, so concurrent runs of the same account stay
+    within one combined rate. Reads (navigation, scrolling, extraction) are
+    never paced.
+    """
+
+    def __init__(self, profile: str = "normal"):
+        if profile not in PACING_PROFILES:
+            raise ValueError(f"Unknown pacing profile '{profile}'. Use one of: {', '.join(PACING_PROFILES)}")
+        self.profile_name = profile
+        self.profile = PACING_PROFILES[profile]
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    async def acquire(self, account: str, action: str) -> float:
+        """Waits until `account` may perform `action`. Returns the seconds waited."""
+        if self.profile is None:
+            return 0.0
+        wait = max(self._bucket(account, action).reserve(), self._bucket(account, "any").reserve())
+        wait += random.uniform(*self.profile["jitter"])
+        await asyncio.sleep(wait)
+        return wait
+
+    async def step(self):
+        """Short human-like pause between the steps of one action."""
+        if self.profile is None:
+            return
+        await asyncio.sleep(random.uniform(*self.profile["step"]))
+
+    def stats(self, account: Optional[str] = None) -> Dict[str, float]:
+        """Tokens currently available per bucket (negative: waiters are queued)."""
+        return {
+            f"{acc}:{action}": round(bucket.tokens, 2)
+            for (acc, action), bucket in self._buckets.items()
+            if account is None or acc == account
+        }
+
+    def _bucket(self, account: str, action: str) -> TokenBucket:
+        key = (account, action)
+        if key not in self._buckets:
+            limits = self.profile[action]
+            self._buckets[key] = TokenBucket(limits["per_hour"], limits["burst"])
+        return self._buckets[key]
+
+
+# Create a single instance to be imported by your app
+action_pacer = ActionPacer(settings.PACING_PROFILE)
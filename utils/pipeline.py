@@ -0,0 +1,128 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+from models.scraped_post import ScrapedPost
+
+# Marks the end of a stage's input
+_DONE = None
+
+
+class PipelineItem:
+    """A scraped post travelling through the pipeline, plus its (future) comment."""
+
+    def __init__(self, index: int, post: ScrapedPost):
+        self.index = index
+        self.post = post
+        self.comment: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class FeedPipeline:
+    """
+    Runs a feed as three overlapping stages connected by bounded queues:
+
+        scraper --> N comment workers --> one action executor
+
+    The scraper keeps scrolling while comments are generated, and the executor
+    acts on posts strictly in scrape order, so its pacing stays human-like.
+    By the time the executor reaches a post its comment is usually ready.
+
+    Workers hand `generate` a list of posts (one comment per post comes back).
+    A worker batches whatever is already queued, as long as `batch_fits` accepts it.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[List[ScrapedPost]], Awaitable[List[str]]],
+        act: Callable[[PipelineItem, str], Awaitable[None]],
+        workers: int = 3,
+        queue_size: int = 10,
+        batch_fits: Callable[[List[ScrapedPost]], bool] = lambda posts: len(posts) <= 1,
+    ):
+        self.generate = generate
+        self.act = act
+        self.batch_fits = batch_fits
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.posts_seen = 0
+
+    async def run(self, source: AsyncIterator[ScrapedPost]) -> int:
+        """Drains `source` through the pipeline. Returns the number of posts handled."""
+        generate_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        action_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        tasks = [
+            asyncio.create_task(self._produce(source, generate_queue, action_queue)),
+            asyncio.create_task(self._execute(action_queue)),
+        ]
+        tasks += [
+            asyncio.create_task(self._generate_worker(generate_queue))
+            for _ in range(self.workers)
+        ]
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception():
+                    raise task.exception()
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._discard(action_queue)
+
+        return self.posts_seen
+
+    @staticmethod
+    def _discard(action_queue: asyncio.Queue):
+        """Drops the posts never acted on; errors left in their comments (the rest of a failed batch) are retrieved, not logged."""
+        while not action_queue.empty():
+            item: Optional[PipelineItem] = action_queue.get_nowait()
+            if item is _DONE:
+                continue
+            item.comment.cancel()
+            if not item.comment.cancelled():
+                item.comment.exception()
+
+    async def _produce(self, source, generate_queue: asyncio.Queue, action_queue: asyncio.Queue):
+        async for post in source:
+            item = PipelineItem(self.posts_seen, post)
+            self.posts_seen += 1
+            await generate_queue.put(item)
+            await action_queue.put(item)
+
+        for _ in range(self.workers):
+            await generate_queue.put(_DONE)
+        await action_queue.put(_DONE)
+
+    async def _generate_worker(self, generate_queue: asyncio.Queue):
+        carry: List[Optional[PipelineItem]] = []
+        while True:
+            first = carry.pop() if carry else await generate_queue.get()
+            if first is _DONE:
+                return
+
+            # Take whatever else is already waiting, while it still fits in one request
+            batch = [first]
+            while not generate_queue.empty():
+                item = generate_queue.get_nowait()
+                if item is _DONE or not self.batch_fits([i.post for i in batch] + [item.post]):
+                    carry.append(item)
+                    break
+                batch.append(item)
+
+            try:
+                comments = await self.generate([i.post for i in batch])
+                for item, comment in zip(batch, comments):
+                    item.comment.set_result(comment)
+            except Exception as e:
+                # Surfaces in the executor, in post order
+                for item in batch:
+                    item.comment.set_exception(e)
+
+    async def _execute(self, action_queue: asyncio.Queue):
+        while True:
+            item: Optional[PipelineItem] = await action_queue.get()
+            if item is _DONE:
+                return
+            comment_text = await item.comment
+            await self.act(item, comment_text)
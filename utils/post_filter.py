@@ -0,0 +1,153 @@
+import re
+import time
+import zlib
+from typing import List, Optional
+import numpy as np
+from pydantic import BaseModel
+from config.settings import settings
+from models.comment_log import CommentLog
+from models.scraped_post import ScrapedPost
+
+# Posts the comment prompt would answer with [SKIP] anyway
+SKIP_PATTERNS = [
+    r"\bwe('re| are) hiring\b",
+    r"#hiring\b",
+    r"\b(is|are|we're) looking for (a|an)\b.*\b(engineer|developer|designer|manager|intern)\b",
+    r"\bopen to work\b",
+    r"\bwork anniversary\b",
+    r"\bhappy (\d+(st|nd|rd|th) )?(work )?anniversary\b",
+    r"\bcelebrating \d+ years?\b",
+    r"\bhappy birthday\b",
+    r"\bstarting a new position\b",
+    r"\bi'?m (happy|excited|thrilled) to (share|announce) that i'?(m|ve|'ve| have) (started|starting|joined|accepted)\b",
+    r"\bthrilled to announce my new role\b",
+]
+_SKIP_RE = re.compile("|".join(f"(?:{p})" for p in SKIP_PATTERNS), re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+class PostOutcome(BaseModel):
+    post_content: str
+    skipped: bool = False
+
+
+class HashedNGramClassifier:
+    """
+    Tiny linear SKIP/KEEP model: word uni- and bigrams hashed into a fixed
+    feature space, with multinomial naive Bayes weights. Training and
+    scoring are a handful of numpy bincounts, so it's CPU-only and fast.
+    """
+
+    def __init__(self, n_features: int = 2 ** 16):
+        self.n_features = n_features
+        self.weights: Optional[np.ndarray] = None
+        self.bias = 0.0
+
+    @property
+    def trained(self) -> bool:
+        return self.weights is not None
+
+    def _hash(self, text: str) -> List[int]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return [zlib.crc32(g.encode("utf-8")) % self.n_features for g in grams]
+
+    def _vectorize(self, texts: List[str]):
+        """Returns (feature index, row index) arrays for all texts at once."""
+        hashed = [self._hash(t) for t in texts]
+        rows = np.repeat(np.arange(len(texts)), [len(h) for h in hashed])
+        features = np.fromiter((i for h in hashed for i in h), dtype=np.int64, count=len(rows))
+        return features, rows
+
+    def fit(self, texts: List[str], skipped: List[bool]):
+        features, rows = self._vectorize(texts)
+        labels = np.asarray(skipped, dtype=bool)
+        row_is_skip = labels[rows]
+
+        skip_counts = np.bincount(features[row_is_skip], minlength=self.n_features) + 1.0
+        keep_counts = np.bincount(features[~row_is_skip], minlength=self.n_features) + 1.0
+
+        self.weights = np.log(skip_counts / skip_counts.sum()) - np.log(keep_counts / keep_counts.sum())
+        self.bias = float(np.log(labels.sum() / (~labels).sum()))
+
+    def predict_skip_proba(self, texts: List[str]) -> np.ndarray:
+        features, rows = self._vectorize(texts)
+        scores = np.bincount(rows, weights=self.weights[features], minlength=len(texts)) + self.bias
+        return 1.0 / (1.0 + np.exp(-scores))
+
+
+class PostPreFilter:
+    """
+    Decides SKIP/KEEP locally, before a post costs an LLM call.
+
+    Keyword rules and a minimum length always apply. The optional classifier
+    is trained from past CommentLog outcomes and only skips posts it is very
+    sure about (`classifier_threshold`).
+    """
+
+    def __init__(
+        self,
+        min_chars: int,
+        classifier_enabled: bool = False,
+        classifier_threshold: float = 0.9,
+        training_limit: int = 2000,
+        retrain_seconds: float = 3600,
+        min_samples_per_class: int = 20
+    ):
+        self.min_chars = min_chars
+        self.classifier_enabled = classifier_enabled
+        self.classifier_threshold = classifier_threshold
+        self.training_limit = training_limit
+        self.retrain_seconds = retrain_seconds
+        self.min_samples_per_class = min_samples_per_class
+        self.classifier = HashedNGramClassifier()
+        self._trained_at = 0.0
+
+    async def ensure_trained(self):
+        """(Re)trains the classifier from recent CommentLog outcomes when it is stale."""
+        if not self.classifier_enabled or time.monotonic() - self._trained_at < self.retrain_seconds:
+            return
+        self._trained_at = time.monotonic()
+        try:
+            outcomes = await CommentLog.find_all().sort(-CommentLog.created_at) \
+                .limit(self.training_limit).project(PostOutcome).to_list()
+        except Exception as e:
+            print(f"Could not load pre-filter training data: {e}")
+            return
+
+        skipped = [o.skipped for o in outcomes]
+        if min(sum(skipped), len(skipped) - sum(skipped)) < self.min_samples_per_class:
+            print("Not enough past outcomes to train the pre-filter classifier yet.")
+            return
+        self.classifier.fit([o.post_content for o in outcomes], skipped)
+        print(f"Pre-filter classifier trained on {len(outcomes)} past posts.")
+
+    def classify(self, posts: List[ScrapedPost]) -> List[Optional[str]]:
+        """Returns a skip reason per post ("rule", "length" or "classifier"), or None to keep it."""
+        reasons: List[Optional[str]] = []
+        for post in posts:
+            content = post.content
+            if len(content) < self.min_chars:
+                reasons.append("length")
+            elif _SKIP_RE.search(content):
+                reasons.append("rule")
+            else:
+                reasons.append(None)
+
+        if self.classifier_enabled and self.classifier.trained:
+            undecided = [i for i, r in enumerate(reasons) if r is None]
+            if undecided:
+                probs = self.classifier.predict_skip_proba([posts[i].content for i in undecided])
+                for i, p in zip(undecided, probs):
+                    if p >= self.classifier_threshold:
+                        reasons[i] = "classifier"
+        return reasons
+
+
+# Create a single instance to be imported by your app
+post_pre_filter = PostPreFilter(
+    min_chars=settings.PREFILTER_MIN_CHARS,
+    classifier_enabled=settings.PREFILTER_CLASSIFIER_ENABLED,
+    classifier_threshold=settings.PREFILTER_CLASSIFIER_THRESHOLD,
+    training_limit=settings.PREFILTER_TRAINING_LIMIT
+)
@@ -0,0 +1,83 @@
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+from beanie.operators import In, Or
+from config.settings import settings
+from models.comment_log import CommentLog
+from utils.comment_cache import normalize_content
+from models.scraped_post import ScrapedPost
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+
+
+class ProcessedKey(BaseModel):
+    post_urn: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+class ProcessedIndex:
+    """
+    Answers "did this account already handle this post in an earlier run?"
+    for a whole scroll batch with a single `$in` query on the compact
+    CommentLog indexes. Keys are per account: a post one account handled is
+    still new to every other account. (account, URN/hash) pairs known to be
+    processed are remembered in a bounded in-process set, so repeat posts
+    don't even need the query.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._known: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+
+    async def filter_new(self, posts: List[ScrapedPost], run_seen: set, account_key: str) -> List[ScrapedPost]:
+        """
+        Returns the posts `account_key` didn't process before, in order. Sets
+        post.content_hash on every post. `run_seen` holds the URNs/hashes
+        already accepted in the current run, so copies within a run drop too.
+        """
+        for post in posts:
+            post.content_hash = content_hash(post.content)
+
+        lookup_urns = [p.urn for p in posts if (account_key, p.urn) not in self._known]
+        lookup_hashes = [p.content_hash for p in posts if (account_key, p.content_hash) not in self._known]
+        if lookup_urns or lookup_hashes:
+            try:
+                found = await CommentLog.find(
+                    CommentLog.account_key == account_key,
+                    Or(
+                        In(CommentLog.post_urn, lookup_urns),
+                        In(CommentLog.content_hash, lookup_hashes)
+                    )
+                ).project(ProcessedKey).to_list()
+            except Exception as e:
+                # Worst case we look at a post twice; never fail the run over it
+                print(f"Processed-post lookup failed: {e}")
+                found = []
+            for key in found:
+                self.mark(account_key, key.post_urn, key.content_hash)
+
+        new_posts = []
+        for post in posts:
+            keys = (post.urn, post.content_hash)
+            if any((account_key, k) in self._known or k in run_seen for k in keys):
+                continue
+            run_seen.update(keys)
+            new_posts.append(post)
+        return new_posts
+
+    def mark(self, account_key: str, *keys: Optional[str]):
+        """Remembers URNs/hashes as processed by the account (called once their log is written)."""
+        for key in keys:
+            if not key:
+                continue
+            self._known[(account_key, key)] = None
+            self._known.move_to_end((account_key, key))
+        while len(self._known) > self.max_size:
+            self._known.popitem(last=False)
+
+
+# Create a single instance to be imported by your app
+processed_index = ProcessedIndex(settings.PROCESSED_INDEX_CACHE_SIZE)
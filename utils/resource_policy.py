@@ -0,0 +1,117 @@
+from typing import Iterable, Dict, Any, List
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Page, Route
+from config.settings import settings
+
+
+# URL patterns (CDP wildcards) standing in for each blockable resource type.
+# LinkedIn's images and videos have no file extension, so their hosts are listed too.
+TYPE_URL_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*://media.licdn.com/dms/image/*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*://dms.licdn.com/*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+}
+
+
+def _split(value: str) -> list:
+    return [v.strip().lower() for v in value.split(",") if v.strip()]
+
+
+class ResourcePolicy:
+    """
+    Which requests a feed page is allowed to make.
+
+    Images, media and fonts (by default) and requests to known analytics or
+    ad hosts are aborted before they leave the browser. Documents, scripts,
+    stylesheets and XHR/fetch go through, since the feed's markup, infinite
+    scroll and buttons depend on them.
+
+    On Chromium the policy becomes a list of blocked URL patterns, checked
+    inside the browser: no request goes through a Python route handler, and
+    the HTTP cache (which Playwright turns off while any route is installed)
+    keeps serving the allowed scripts and stylesheets across navigations.
+    Resource types are matched by URL there (see TYPE_URL_PATTERNS), so an
+    image served from an unlisted host without an extension gets through.
+    """
+
+    def __init__(self, resource_types: Iterable[str], blocked_hosts: Iterable[str]):
+        self.resource_types = set(resource_types)
+        self.blocked_hosts = tuple(blocked_hosts)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.blocked_hosts)
+
+    def url_patterns(self) -> List[str]:
+        patterns = [p for t in sorted(self.resource_types) for p in TYPE_URL_PATTERNS.get(t, [])]
+        for host in self.blocked_hosts:
+            patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+        return patterns
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        if not self.blocked_hosts:
+            return False
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == h or host.endswith("." + h) for h in self.blocked_hosts)
+
+
+class NetworkStats:
+    """Per-run network accounting for one page: requests, bytes received and blocked requests."""
+
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.load_ms = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "load_ms": self.load_ms,
+            "requests": self.requests,
+            "blocked_requests": self.blocked,
+            "bytes_received": self.bytes,
+        }
+
+
+async def install(context: BrowserContext, page: Page, policy: "ResourcePolicy", stats: NetworkStats):
+    """Applies `policy` to the page and starts counting its traffic into `stats`."""
+    try:
+        # Encoded (over-the-wire) sizes and URL blocking come from the DevTools protocol, so this is Chromium-only
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+
+        def on_finished(event: Dict[str, Any]):
+            stats.requests += 1
+            stats.bytes += int(event.get("encodedDataLength") or 0)
+
+        def on_failed(event: Dict[str, Any]):
+            if event.get("blockedReason"):
+                stats.blocked += 1
+        cdp.on("Network.loadingFinished", on_finished)
+        cdp.on("Network.loadingFailed", on_failed)
+
+        if policy.enabled:
+            await cdp.send("Network.setBlockedURLs", {"urls": policy.url_patterns()})
+        return
+    except Exception as e:
+        print(f"Network byte counting and in-browser blocking unavailable: {e}")
+
+    if policy.enabled:
+        # Fallback: every request goes through this handler, and Playwright disables the HTTP cache
+        async def handle(route: Route):
+            request = route.request
+            if policy.should_block(request.resource_type, request.url):
+                stats.blocked += 1
+                await route.abort()
+            else:
+                await route.continue_()
+        await context.route("**/*", handle)
+
+
+# Create a single instance to be imported by your app
+resource_policy = ResourcePolicy(
+    resource_types=_split(settings.BLOCK_RESOURCE_TYPES),
+    blocked_hosts=_split(settings.BLOCK_HOSTS)
+)
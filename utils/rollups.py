@@ -0,0 +1,125 @@
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Iterable
+from pymongo import UpdateOne
+from models.comment_log import CommentLog
+from models.daily_rollup import DailyRollup
+
+ROLLUP_FIELDS = ("posts_seen", "comments_posted", "likes", "skipped")
+ALL_AUTHORS = ""
+
+
+def _day(when: datetime) -> str:
+    return when.strftime("%Y-%m-%d")
+
+
+def _count_true(field: str) -> Dict[str, Any]:
+    return {"$sum": {"$cond": [f"${field}", 1, 0]}}
+
+
+def _with_rates(row: Dict[str, Any]) -> Dict[str, Any]:
+    seen = row.get("posts_seen") or 0
+    row["skip_rate"] = round(row.get("skipped", 0) / seen, 3) if seen else None
+    return row
+
+
+def rollup_increments(logs: Iterable[CommentLog]) -> Dict[Tuple[str, str], Counter]:
+    """What `logs` add to each (day, author) rollup, and to each day's total."""
+    increments: Dict[Tuple[str, str], Counter] = {}
+    for log in logs:
+        counts = Counter(
+            posts_seen=1,
+            comments_posted=int(log.posted_to_linkedin),
+            likes=int(log.liked_post),
+            skipped=int(log.skipped)
+        )
+        day = _day(log.created_at)
+        # A set, so a post without an author only counts towards the day's total once
+        for key in {(day, log.post_author), (day, ALL_AUTHORS)}:
+            increments.setdefault(key, Counter()).update(counts)
+    return increments
+
+
+class RollupStore:
+    """
+    Daily activity totals, kept up to date as CommentLogs are written.
+
+    The log sink hands every written batch to `apply()`, which turns it into
+    one `$inc` upsert per (day, author), all in a single bulk write. Reading
+    analytics then touches one small document per day (or per day and
+    author) instead of scanning `comment_logs`.
+    """
+
+    async def apply(self, logs: List[CommentLog]):
+        increments = rollup_increments(logs)
+        if not increments:
+            return
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"day": day, "author": author},
+                {"$inc": {field: counts[field] for field in ROLLUP_FIELDS}, "$set": {"updated_at": now}},
+                upsert=True
+            )
+            for (day, author), counts in increments.items()
+        ]
+        await DailyRollup.get_pymongo_collection().bulk_write(operations, ordered=False)
+
+    async def rebuild(self) -> int:
+        """
+        Recomputes every rollup from `comment_logs` (one aggregation).
+        For logs written before rollups existed, or after lost updates; best
+        run while no agent is running, since concurrent increments are lost.
+        """
+        groups = await CommentLog.aggregate([
+            {"$group": {
+                "_id": {
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                    "author": "$post_author"
+                },
+                "posts_seen": {"$sum": 1},
+                "comments_posted": _count_true("posted_to_linkedin"),
+                "likes": _count_true("liked_post"),
+                "skipped": _count_true("skipped"),
+            }}
+        ]).to_list()
+
+        rows: Dict[Tuple[str, str], Counter] = {}
+        for group in groups:
+            counts = Counter({field: group[field] for field in ROLLUP_FIELDS})
+            day = group["_id"]["day"]
+            for key in {(day, group["_id"]["author"] or ALL_AUTHORS), (day, ALL_AUTHORS)}:
+                rows.setdefault(key, Counter()).update(counts)
+
+        await DailyRollup.find_all().delete()
+        if rows:
+            await DailyRollup.insert_many([
+                DailyRollup(day=day, author=author, **{field: counts[field] for field in ROLLUP_FIELDS})
+                for (day, author), counts in rows.items()
+            ])
+        return len(rows)
+
+    async def by_day(self, since: datetime, until: datetime) -> List[Dict[str, Any]]:
+        docs = await DailyRollup.find(
+            DailyRollup.author == ALL_AUTHORS,
+            DailyRollup.day >= _day(since),
+            DailyRollup.day <= _day(until)
+        ).sort(+DailyRollup.day).to_list()
+        return [_with_rates({"day": d.day, **{f: getattr(d, f) for f in ROLLUP_FIELDS}}) for d in docs]
+
+    async def by_author(self, since: datetime, until: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Totals per author over the range, most active first."""
+        docs = await DailyRollup.find(
+            DailyRollup.author != ALL_AUTHORS,
+            DailyRollup.day >= _day(since),
+            DailyRollup.day <= _day(until)
+        ).to_list()
+        totals: Dict[str, Counter] = {}
+        for d in docs:
+            totals.setdefault(d.author, Counter()).update({f: getattr(d, f) for f in ROLLUP_FIELDS})
+        ranked = sorted(totals.items(), key=lambda item: (-item[1]["posts_seen"], item[0]))[:limit]
+        return [_with_rates({"author": author, **{f: counts[f] for f in ROLLUP_FIELDS}}) for author, counts in ranked]
+
+
+# Create a single instance to be imported by your app
+rollup_store = RollupStore()
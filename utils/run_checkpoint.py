@@ -0,0 +1,153 @@
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from beanie.operators import In
+from config.settings import settings
+from models.agent_job import AgentJob
+from models.api_models import AgentStartRequest
+from models.run_checkpoint import RunCheckpoint
+from utils.accounts import account_key
+
+
+class ResumeError(Exception):
+    pass
+
+
+class Checkpointer:
+    """
+    Records a run's per-post progress in its RunCheckpoint.
+
+    Generated comments and finished posts are recorded as they happen and
+    written at most every `save_interval` seconds (plus once when the run
+    ends), so checkpointing costs a handful of writes per run, not one per
+    post. A failed run can then be resumed without acting on a post twice or
+    paying for its comments again.
+    """
+
+    def __init__(self, doc: RunCheckpoint, save_interval: float):
+        self.doc = doc
+        self.save_interval = save_interval
+        self.resumed = doc.resumed_from is not None
+        self._done = set(doc.done_urns)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    @property
+    def stage(self) -> str:
+        return self.doc.stage
+
+    def is_done(self, urn: str) -> bool:
+        return urn in self._done
+
+    def comment_for(self, urn: str) -> Optional[str]:
+        return self.doc.comments.get(urn)
+
+    async def record_comments(self, comments: Dict[str, str]):
+        self.doc.comments.update(comments)
+        await self._changed()
+
+    async def record_done(self, urn: str, log: Optional[Dict[str, Any]] = None):
+        if urn not in self._done:
+            self._done.add(urn)
+            self.doc.done_urns.append(urn)
+        self.doc.comments.pop(urn, None)
+        if log is not None:
+            self.doc.final_logs.append(log)
+        await self._changed()
+
+    async def feed_done(self, run_stats: Dict[str, Any], summary_parts: List[str], summary_source: List[str]):
+        """process_feed finished: a resume only has the summary left to do."""
+        self.doc.stage = "generate_summary"
+        self.doc.comments = {}
+        self.doc.run_stats = run_stats
+        self.doc.summary_parts = summary_parts
+        self.doc.summary_source = summary_source
+        await self.save()
+
+    async def finished(self):
+        self.doc.stage = "done"
+        # Only needed for a resume, and a finished run has nothing left to resume
+        self.doc.summary_parts = []
+        self.doc.summary_source = []
+        await self.save()
+
+    async def save(self):
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.doc.updated_at = datetime.utcnow()
+        try:
+            await self.doc.save()
+        except Exception as e:
+            # A lost checkpoint only costs the ability to resume; never the run itself
+            print(f"Could not save checkpoint for run {self.doc.run_id}: {e}")
+
+    async def flush(self):
+        if self._dirty:
+            await self.save()
+
+    async def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            await self.save()
+
+
+class CheckpointStore:
+    """Opens and tracks the checkpoints of the runs active in this process."""
+
+    def __init__(self, save_interval: float):
+        self.save_interval = save_interval
+        self._active: Dict[str, Checkpointer] = {}
+
+    async def get(self, run_id: str) -> Optional[RunCheckpoint]:
+        return await RunCheckpoint.find_one(RunCheckpoint.run_id == run_id)
+
+    async def check_resumable(self, run_id: str, cookie_json: str) -> RunCheckpoint:
+        """The checkpoint `run_id` can be resumed from with these cookies, or a ResumeError."""
+        doc = await self.get(run_id)
+        if doc is None:
+            raise ResumeError("No checkpoint for this run (it may have been resumed already, or expired).")
+        if run_id in self._active:
+            raise ResumeError("This run is still in progress.")
+        pending = await AgentJob.find_one(AgentJob.resumed_from == run_id, In(AgentJob.status, ["queued", "running"]))
+        if pending is not None:
+            raise ResumeError(f"This run is already being resumed by job {pending.job_id}.")
+        if doc.stage == "done":
+            raise ResumeError("This run already finished.")
+        if doc.account_key != account_key(cookie_json):
+            raise ResumeError("These cookies belong to a different LinkedIn account than the run.")
+        return doc
+
+    async def open(self, run_id: str, request: AgentStartRequest) -> Checkpointer:
+        doc = None
+        if request.resume_from:
+            doc = await self.get(request.resume_from)
+            if doc is None:
+                print(f"Checkpoint of run {request.resume_from} is gone; starting over.")
+        if doc is not None:
+            # The resumed run takes the checkpoint over, so it can be resumed in turn
+            doc.resumed_from = doc.run_id
+            doc.run_id = run_id
+        else:
+            doc = RunCheckpoint(
+                run_id=run_id,
+                account_key=account_key(request.cookie_json),
+                auto_comment=request.auto_comment,
+                auto_like=request.auto_like,
+                max_posts=request.max_posts_to_process
+            )
+        checkpointer = Checkpointer(doc, self.save_interval)
+        await checkpointer.save()
+        self._active[run_id] = checkpointer
+        return checkpointer
+
+    def for_run(self, run_id: Optional[str]) -> Optional[Checkpointer]:
+        return self._active.get(run_id) if run_id else None
+
+    async def close(self, run_id: str):
+        checkpointer = self._active.pop(run_id, None)
+        if checkpointer is not None:
+            await checkpointer.flush()
+
+
+# Create a single instance to be imported by your app
+checkpoint_store = CheckpointStore(save_interval=settings.CHECKPOINT_SAVE_INTERVAL)
@@ -0,0 +1,65 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Any, Optional
+from cryptography.fernet import Fernet, InvalidToken
+from beanie.operators import Set
+from config.settings import settings
+from models.session_state import SessionState
+
+
+def _fernet_key(secret: str, fallback: str) -> bytes:
+    """The configured Fernet key, or one derived from `fallback` when none is set."""
+    if secret:
+        return secret.encode("utf-8")
+    digest = hashlib.sha256(f"session-state:{fallback}".encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest)
+
+
+class SessionStore:
+    """
+    Encrypted Playwright storage_state snapshots, one per LinkedIn account.
+
+    A run whose account has a snapshot starts from that warm session (cookies
+    plus local storage) instead of a blank context fed the raw cookie export.
+    Snapshots are refreshed after successful runs and dropped as soon as
+    LinkedIn redirects a restored session to a login page.
+    """
+
+    def __init__(self, key: bytes, enabled: bool = True):
+        self.enabled = enabled
+        self._fernet = Fernet(key)
+
+    async def load(self, account: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        doc = await SessionState.find_one(SessionState.account_key == account)
+        if doc is None:
+            return None
+        try:
+            return json.loads(self._fernet.decrypt(doc.encrypted_state.encode("utf-8")))
+        except (InvalidToken, ValueError):
+            # Written with another key (or corrupted); it can never be read again
+            print(f"Discarding unreadable session snapshot for account {account}.")
+            await doc.delete()
+            return None
+
+    async def save(self, account: str, storage_state: Dict[str, Any]):
+        if not self.enabled:
+            return
+        token = self._fernet.encrypt(json.dumps(storage_state, separators=(",", ":")).encode("utf-8")).decode("utf-8")
+        await SessionState.find_one(SessionState.account_key == account).upsert(
+            Set({SessionState.encrypted_state: token, SessionState.updated_at: datetime.utcnow()}),
+            on_insert=SessionState(account_key=account, encrypted_state=token)
+        )
+
+    async def invalidate(self, account: str):
+        await SessionState.find(SessionState.account_key == account).delete()
+
+
+# Create a single instance to be imported by your app
+session_store = SessionStore(
+    key=_fernet_key(settings.SESSION_STATE_KEY, settings.ADMIN_API_KEY),
+    enabled=settings.SESSION_STATE_ENABLED
+)
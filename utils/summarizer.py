@@ -0,0 +1,112 @@
+import asyncio
+from typing import List, Optional, Tuple
+from langchain_core.messages import SystemMessage, HumanMessage
+from utils.comment_generator import estimate_tokens, token_usage
+from utils.metrics import RunMetrics, llm_span
+
+POST_SEPARATOR = "\n\n---\n\n"
+
+
+class FeedSummarizer:
+    """
+    Token-budgeted map-reduce summarizer for the feed.
+
+    Posts are added while the feed is still being processed. Every time the
+    current chunk reaches `chunk_tokens`, a partial summary of it starts in
+    the background (at most `concurrency` at a time). `collapse()` then
+    reduces the partial summaries level by level until they fit in a
+    single final prompt.
+
+    Small feeds that never fill a chunk produce no partial summaries; the
+    caller summarizes those posts directly in one request. Posts whose
+    partial summary failed are handed back the same way, for the final
+    request to cover.
+    """
+
+    def __init__(self, llm, map_prompt: str, reduce_prompt: str, chunk_tokens: int = 6000, concurrency: int = 2, metrics: Optional[RunMetrics] = None):
+        self.llm = llm
+        self.map_prompt = map_prompt
+        self.reduce_prompt = reduce_prompt
+        self.chunk_tokens = chunk_tokens
+        self.metrics = metrics
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._chunk: List[str] = []
+        self._chunk_size = 0
+        self._tasks: List[Tuple[asyncio.Task, List[str]]] = []
+
+    def add(self, content: Optional[str]):
+        if not content:
+            return
+        tokens = estimate_tokens(content)
+        if self._chunk and self._chunk_size + tokens > self.chunk_tokens:
+            self._start_map()
+        self._chunk.append(content)
+        self._chunk_size += tokens
+
+    async def drain(self) -> List[str]:
+        """
+        Waits for the partial summaries. Returns [] if the feed fit in a single
+        chunk. The posts of failed chunks are kept for `take_pending()`.
+        """
+        if not self._tasks:
+            return []
+        if self._chunk:
+            self._start_map()
+
+        tasks, self._tasks = self._tasks, []
+        results = await asyncio.gather(*(task for task, _ in tasks), return_exceptions=True)
+        parts = []
+        for (_, chunk), result in zip(tasks, results):
+            if isinstance(result, Exception):
+                print(f"Partial summary failed ({result}), its {len(chunk)} posts go into the final summary")
+                self._chunk.extend(chunk)
+                self._chunk_size += sum(estimate_tokens(text) for text in chunk)
+            elif result:
+                parts.append(result)
+        return parts
+
+    def take_pending(self) -> List[str]:
+        """Hands over (and forgets) the posts not summarized yet."""
+        chunk = self._chunk
+        self._chunk, self._chunk_size = [], 0
+        return chunk
+
+    def cancel(self):
+        """Stops partial summaries still running (e.g. the run failed)."""
+        for task, _ in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def collapse(self, parts: List[str]) -> List[str]:
+        """Reduces partial summaries in groups until all of them fit in one prompt."""
+        while len(parts) > 1 and sum(estimate_tokens(p) for p in parts) > self.chunk_tokens:
+            groups, group, size = [], [], 0
+            for part in parts:
+                tokens = estimate_tokens(part)
+                if group and size + tokens > self.chunk_tokens:
+                    groups.append(group)
+                    group, size = [], 0
+                group.append(part)
+                size += tokens
+            groups.append(group)
+            if len(groups) == len(parts):
+                # Every part is already a group of one; reducing further can't shrink the prompt
+                break
+
+            parts = await asyncio.gather(*(
+                self._summarize(self.reduce_prompt, "PARTIAL SUMMARIES", g, "summary_reduce") for g in groups
+            ))
+        return parts
+
+    def _start_map(self):
+        chunk = self._chunk
+        self._chunk, self._chunk_size = [], 0
+        self._tasks.append((asyncio.create_task(self._summarize(self.map_prompt, "POSTS", chunk, "summary_map")), chunk))
+
+    async def _summarize(self, prompt: str, label: str, texts: List[str], purpose: str) -> str:
+        async with self._semaphore:
+            messages = [SystemMessage(prompt), HumanMessage(f"--- {label} ---\n{POST_SEPARATOR.join(texts)}")]
+            with llm_span(purpose, self.metrics) as span:
+                response = await self.llm.ainvoke(messages)
+                span.set(**token_usage(messages, response))
+            return response.content.strip()
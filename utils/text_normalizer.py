@@ -0,0 +1,51 @@
+import re
+
+# LinkedIn UI text that ends up at the end of the commentary node's textContent
+_UI_ARTIFACTS = re.compile(
+    r"\s*(?:(?:…|\.{3})\s*(?:see\s+)?more|see\s+(?:more|less)|show\s+(?:translation|original))\s*$",
+    re.IGNORECASE
+)
+_HASHTAG_PREFIX = re.compile(r"\bhashtag\s*#", re.IGNORECASE) # Screen-reader text before each tag
+_TRAILING_HASHTAGS = re.compile(r"(?:\s*#[\w-]+){2,}\s*$")
+_EMOJI = "\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF"
+_EMOJI_RUN = re.compile(f"([{_EMOJI}])[{_EMOJI}\ufe0f\u200d\U0001F3FB-\U0001F3FF]+") # Keeps the first of a run
+_REPEATED_PUNCTUATION = re.compile(r"([!?.\-_*=~])\1{3,}")
+_SPACES = re.compile(r"[ \t\u00a0\u200b]+")
+_LINE_BREAKS = re.compile(r"\s*\n\s*")
+
+
+def compact_prompt(text: str) -> str:
+    """Drops the indentation and blank lines of a triple-quoted prompt; they cost tokens and add nothing."""
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def normalize_post_text(text: str, max_tokens: int = 0) -> str:
+    """
+    Cleans a scraped post for a prompt: trailing UI text ("…see more"), the
+    trailing hashtag block, emoji runs, repeated punctuation and whitespace
+    are removed or collapsed, and the text is cut to about `max_tokens`
+    (0 keeps it whole) at a sentence or word boundary.
+    """
+    if not text:
+        return ""
+    stripped = None
+    while stripped != text:
+        stripped, text = text, _UI_ARTIFACTS.sub("", text)
+    text = _HASHTAG_PREFIX.sub("#", text)
+    text = _TRAILING_HASHTAGS.sub("", text) or text
+    text = _EMOJI_RUN.sub(r"\1", text)
+    text = _REPEATED_PUNCTUATION.sub(r"\1", text)
+    text = _SPACES.sub(" ", text)
+    text = _LINE_BREAKS.sub("\n", text).strip()
+
+    # Same ~4 characters per token as estimate_tokens
+    max_chars = max_tokens * 4
+    if max_tokens and len(text) > max_chars:
+        cut = text[:max_chars]
+        sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "), cut.rfind("\n"))
+        if sentence_end >= max_chars // 2:
+            cut = cut[:sentence_end + 1]
+        elif " " in cut:
+            cut = cut[:cut.rfind(" ")]
+        text = cut.rstrip() + " …"
+    return text
@@ -1,39 +1,57 @@
 from dotenv import load_dotenv
 from typing import TypedDict, List, Dict, Any, Optional
-from langgraph.graph import StateGraph, START, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.graph import StateGraph, END
 from config.settings import settings
 from utils.automation import LinkedInAutomator
 from models.comment_log import CommentLog
 from utils.connection_manager import manager
-import random
+from utils.pipeline import FeedPipeline, PipelineItem
+from models.scraped_post import ScrapedPost
+from utils.comment_generator import CommentGenerator, SKIP, estimate_tokens, prompt_text
+from utils.comment_cache import comment_cache
+from utils.post_filter import post_pre_filter
+from utils.near_dup import NearDuplicateDetector
+from utils.processed_index import processed_index
+from utils.accounts import account_key
+from utils.log_sink import log_sink
+from utils.summarizer import FeedSummarizer, POST_SEPARATOR
+from utils.text_normalizer import compact_prompt, normalize_post_text
+from utils.metrics import POSTS, span, llm_span, for_run
+from utils.llm_gateway import llm_gateway
+from utils.run_checkpoint import checkpoint_store
 import asyncio
+from langchain_core.messages import SystemMessage, HumanMessage
 
 load_dotenv()
 
 # --- 1. Define State ---
 class AgentState(TypedDict):
+    run_id: str
     auto_comment: bool
     auto_like: bool
     max_posts: int
     user_voice_prompt: str
     cookie_json: str
+    feed_done: bool # Resumed after the feed was fully processed: only the summary is left
     
-    scraped_posts: List[Dict[str, Any]]
+    # Only what later nodes read is kept here, so state size doesn't grow with max_posts:
+    # summary_source holds at most one summary chunk of post text (the feed when it's small),
+    # plus the posts of any chunk whose partial summary failed.
+    summary_source: List[str]
     final_logs: List[Dict[str, Any]]
+    run_stats: Dict[str, Any]
+    summary_parts: List[str]
     summary: str
     error: Optional[str]
 
 # --- 2. Define LLM ---
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash", 
-    temperature=0.7,
-    google_api_key=settings.GEMINI_API_KEY
-)
+# Every call goes through the gateway (concurrency limit, deadlines, retries, circuit breaker).
+# The Gemini client itself is built on the first call, or by the startup warm-up.
+llm = llm_gateway
 
 # --- 3. Define System Prompts ---
 def get_comment_system_prompt(voice_prompt: str) -> str:
-    return f"""
+    return compact_prompt(f"""
     You are a professional social media engagement assistant. Your goal is to write a short, genuine, and human-sounding comment for a LinkedIn post.
     IMPORTANT: Follow this user's defined "voice" and tone:
     --- USER VOICE ---
@@ -43,25 +61,60 @@ def get_comment_system_prompt(voice_prompt: str) -> str:
     - If the post is not insightful (e.g., "Hiring!", "Happy work anniversary!"), just output the single word: [SKIP]
     - Otherwise, generate a 2-3 sentence comment.
     - Do NOT include greetings or sign-offs.
-    """
+    """)
 
 def get_summary_system_prompt() -> str:
-    return """
+    return compact_prompt("""
     You are a professional analyst. You will be given a list of LinkedIn post contents.
     Your task is to generate a concise "Daily Summary" of what the user's network talked about.
     Summarize the top 3-4 key themes or topics you observed.
     Use bullet points.
-    """
+    """)
+
+def get_summary_map_prompt() -> str:
+    return compact_prompt("""
+    You are a professional analyst. You will be given one batch of LinkedIn post contents from a larger feed.
+    List the key themes or topics discussed in this batch, with a short note on each.
+    Use bullet points. Be concise; your notes will be merged with notes from other batches.
+    """)
+
+def get_summary_reduce_prompt() -> str:
+    return compact_prompt("""
+    You are a professional analyst. You will be given partial summaries, each covering part of the user's LinkedIn feed.
+    Your task is to generate a concise "Daily Summary" of what the user's network talked about.
+    Some posts may also be given as they are, when their partial summary is missing; cover them too.
+    Merge overlapping themes and summarize the top 3-4 key themes or topics overall.
+    Use bullet points.
+    """)
 
 # --- 4. Define Graph Nodes ---
+async def emit(state: AgentState, data: Dict[str, Any]):
+    """Sends an event to the dashboards watching this run (never blocks on a socket)."""
+    await manager.broadcast(data, run_id=state.get('run_id'))
+
 async def setup_task(state: AgentState) -> AgentState:
     print("Node: setup_task")
-    await manager.broadcast({"type": "status", "message": "Task initialized. Setting up..."})
+    await emit(state, {"type": "status", "message": "Task initialized. Setting up..."})
     try:
         state['user_voice_prompt'] = settings.USER_VOICE_PROMPT
         state['final_logs'] = []
-        state['scraped_posts'] = []
+        state['summary_source'] = []
+        state['run_stats'] = {}
+        state['summary_parts'] = []
         state['summary'] = "No summary generated."
+
+        checkpoint = checkpoint_store.for_run(state['run_id'])
+        if checkpoint and checkpoint.resumed:
+            state['final_logs'] = list(checkpoint.doc.final_logs)
+            if checkpoint.stage == "generate_summary":
+                state['feed_done'] = True
+                state['run_stats'] = dict(checkpoint.doc.run_stats)
+                state['summary_parts'] = list(checkpoint.doc.summary_parts)
+                state['summary_source'] = list(checkpoint.doc.summary_source)
+            await emit(state, {
+                "type": "status",
+                "message": f"Resuming run {checkpoint.doc.resumed_from}: {len(checkpoint.doc.done_urns)} posts already handled."
+            })
         return state
     except Exception as e:
         print(f"Error in setup_task: {e}")
@@ -72,121 +125,349 @@ async def process_feed(state: AgentState) -> AgentState:
     print("Node: process_feed")
     if state.get('error'): return state
     
-    await manager.broadcast({"type": "status", "message": "Initializing browser automation..."})
+    await emit(state, {"type": "status", "message": "Initializing browser automation..."})
     
     comment_prompt_template = get_comment_system_prompt(state['user_voice_prompt'])
+    run_stats = state['run_stats']
+    run_stats.update({
+        "posts_scraped": 0,
+        "already_processed": 0,
+        "near_duplicates": 0,
+        "prefilter_skipped": {"rule": 0, "length": 0, "classifier": 0}
+    })
+    run_seen = set()
+    # "Already processed" is per account: other accounts still act on posts this one handled
+    account = account_key(state['cookie_json'])
+    run_metrics = for_run(state['run_id'])
+    checkpoint = checkpoint_store.for_run(state['run_id'])
+    if checkpoint and checkpoint.resumed:
+        run_stats.update({"resumed_skipped": 0, "comments_reused": 0})
+    # Partial summaries are produced while the feed is still being processed
+    summarizer = FeedSummarizer(
+        llm,
+        get_summary_map_prompt(),
+        get_summary_reduce_prompt(),
+        chunk_tokens=settings.SUMMARY_CHUNK_TOKENS,
+        concurrency=settings.SUMMARY_MAP_CONCURRENCY,
+        metrics=run_metrics
+    )
     
     try:
+        await post_pre_filter.ensure_trained()
+        near_dups = None
+        if settings.NEAR_DUP_ENABLED:
+            near_dups = await NearDuplicateDetector.load(
+                settings.NEAR_DUP_INDEX_SIZE,
+                account,
+                max_distance=settings.NEAR_DUP_MAX_DISTANCE,
+                min_tokens=settings.NEAR_DUP_MIN_TOKENS,
+                short_shingles=settings.NEAR_DUP_SHORT_SHINGLES,
+                min_containment=settings.NEAR_DUP_MIN_CONTAINMENT
+            )
+
         automator = LinkedInAutomator(
             cookie_json=state['cookie_json'],
             auto_like=state['auto_like'],
-            auto_comment=state['auto_comment']
+            auto_comment=state['auto_comment'],
+            metrics=run_metrics
         )
         
         async with automator:
-            await manager.broadcast({"type": "status", "message": "Navigating to LinkedIn feed..."})
+            await emit(state, {"type": "status", "message": "Navigating to LinkedIn feed..."})
             await automator.go_to_feed()
             
-            await manager.broadcast({"type": "status", "message": f"Scrolling to find {state['max_posts']} posts..."})
-            scraped_posts = await automator.scroll_and_scrape_posts(state['max_posts'])
-            
-            if not scraped_posts:
-                 await manager.broadcast({"type": "status", "message": "No posts found on the feed. Ending run."})
-                 return state
+            await emit(state, {"type": "status", "message": f"Scrolling to find {state['max_posts']} posts..."})
 
-            await manager.broadcast({"type": "status", "message": f"Found {len(scraped_posts)} posts. Starting processing..."})
+            async def scraped_posts():
+                # Stage 1: posts flow into the pipeline as soon as each scroll extracts them
+                async for batch in automator.iter_post_batches(state['max_posts']):
+                    run_stats['posts_scraped'] += len(batch)
+                    POSTS.inc(len(batch), outcome="scraped")
+                    for post in batch:
+                        summarizer.add(normalize_post_text(post.content, settings.POST_MAX_TOKENS))
 
-            for i, post in enumerate(scraped_posts):
-                post_content = post['content']
-                post_author = post['author']
-                state['scraped_posts'].append(post)
-                
-                await manager.broadcast({
+                    # Handled before the run was resumed (possibly not in processed_index yet)
+                    if checkpoint and checkpoint.resumed:
+                        done = [p for p in batch if checkpoint.is_done(p.urn)]
+                        if done:
+                            run_stats['resumed_skipped'] += len(done)
+                            automator.finish_posts(*(p.urn for p in done))
+                            batch = [p for p in batch if not checkpoint.is_done(p.urn)]
+
+                    # Posts handled in earlier runs: one bulk lookup per scroll batch
+                    with span("db_lookup", run_metrics):
+                        new_posts = await processed_index.filter_new(batch, run_seen, account)
+                    run_stats['already_processed'] += len(batch) - len(new_posts)
+                    POSTS.inc(len(batch) - len(new_posts), outcome="already_processed")
+                    kept = {id(p) for p in new_posts}
+                    automator.finish_posts(*(p.urn for p in batch if id(p) not in kept))
+                    batch = new_posts
+
+                    # Reshares and reposts of a post seen before: collapsed into that post
+                    if near_dups:
+                        originals = near_dups.check(batch)
+                        for post, original in zip(batch, originals):
+                            if original:
+                                run_stats['near_duplicates'] += 1
+                                POSTS.inc(outcome="near_duplicate")
+                                automator.finish_posts(post.urn)
+                                await emit(state, {"type": "log", "message": f"Skipping post by {post.author} (near-duplicate of {original})."})
+                        batch = [p for p, original in zip(batch, originals) if not original]
+
+                    # Low-value posts are dropped locally, before they cost an LLM call
+                    skip_reasons = post_pre_filter.classify(batch) if settings.PREFILTER_ENABLED else [None] * len(batch)
+                    for post, reason in zip(batch, skip_reasons):
+                        if reason:
+                            run_stats['prefilter_skipped'][reason] += 1
+                            POSTS.inc(outcome="prefiltered")
+                            automator.finish_posts(post.urn)
+                            await emit(state, {"type": "log", "message": f"Skipping post by {post.author} (pre-filter: {reason})."})
+                            continue
+                        yield post
+
+            async def save_log(log_entry: CommentLog, record: Optional[Dict[str, Any]] = None):
+                # Buffered write-behind: no database round trip in the executor
+                await log_sink.put(log_entry)
+                processed_index.mark(account, log_entry.post_urn, log_entry.content_hash)
+                if near_dups:
+                    near_dups.handled(log_entry.post_urn)
+                if record is not None:
+                    state['final_logs'].append(record)
+                if checkpoint:
+                    await checkpoint.record_done(log_entry.post_urn, record)
+                # The post is done; its feed node can go
+                automator.finish_posts(log_entry.post_urn)
+
+            async def act_on_post(item: PipelineItem, comment_text: str):
+                # Stage 3: a single executor acts in scrape order; likes/comments wait on the account's pacer
+                post = item.post
+                post_author = post.author
+
+                await emit(state, {
                     "type": "status", 
-                    "message": f"Processing post {i+1}/{len(scraped_posts)} from {post_author}..."
+                    "message": f"Processing post {item.index + 1} from {post_author}..."
                 })
 
-                # 1. Generate Comment
-                full_prompt = f"{comment_prompt_template}\n\n--- POST ---\nAuthor: {post_author}\nContent: {post_content}"
-                response = await llm.ainvoke(full_prompt)
-                comment_text = response.content.strip()
-
-                if comment_text == "[SKIP]":
-                    await manager.broadcast({"type": "log", "message": f"Skipping post by {post_author} (not insightful)."})
-                    continue
+                if comment_text == SKIP:
+                    POSTS.inc(outcome="skipped")
+                    await emit(state, {"type": "log", "message": f"Skipping post by {post_author} (not insightful)."})
+                    # Skips are logged too; they are the negative examples the pre-filter learns from
+                    await save_log(CommentLog(
+                        account_key=account,
+                        post_urn=post.urn,
+                        content_hash=post.content_hash,
+                        post_author=post_author,
+                        post_content=post.content,
+                        generated_comment=SKIP,
+                        skipped=True
+                    ))
+                    return
                 
-                await manager.broadcast({"type": "log", "message": f"Generated comment: '{comment_text[:50]}...'"})
+                await emit(state, {"type": "log", "message": f"Generated comment: '{comment_text[:50]}...'"})
 
                 # 2. Perform Actions (Like/Comment)
                 action_results = await automator.perform_actions(post, comment_text)
+                if action_results["posted"]:
+                    POSTS.inc(outcome="commented")
+                if action_results["liked"]:
+                    POSTS.inc(outcome="liked")
                 
                 # 3. Log to DB and State
                 log_entry = CommentLog(
+                    account_key=account,
+                    post_urn=post.urn,
+                    content_hash=post.content_hash,
                     post_author=post_author,
-                    post_content=post_content,
+                    post_content=post.content,
                     generated_comment=comment_text,
                     posted_to_linkedin=action_results["posted"],
                     liked_post=action_results["liked"]
                 )
-                await log_entry.insert()
+                # The post text is in the CommentLog already; the run record keeps the outcome only
+                await save_log(log_entry, log_entry.model_dump(exclude={'id', 'post_content'}))
                 
-                await manager.broadcast({
+                await emit(state, {
                     "type": "result", 
                     "log": log_entry.model_dump(include={'post_author', 'generated_comment', 'posted_to_linkedin'})
                 })
-                
-                state['final_logs'].append(log_entry.model_dump())
-                
-                delay = random.uniform(8, 15)
-                await manager.broadcast({"type": "status", "message": f"Pausing for {delay:.1f}s..."})
-                await asyncio.sleep(delay)
+
+            # Stage 2 runs on several workers ahead of the executor, several posts per request
+            generator = CommentGenerator(
+                llm,
+                comment_prompt_template,
+                max_batch_size=settings.LLM_BATCH_MAX_POSTS,
+                token_budget=settings.LLM_BATCH_TOKEN_BUDGET,
+                cache=comment_cache,
+                metrics=run_metrics,
+                post_max_tokens=settings.POST_MAX_TOKENS
+            )
+
+            async def generate_comments(posts: List[ScrapedPost]) -> List[str]:
+                if not checkpoint:
+                    return await generator.generate_batch(posts)
+                # Comments generated before a resume are reused as they are
+                comments = {p.urn: checkpoint.comment_for(p.urn) for p in posts}
+                todo = [p for p in posts if comments[p.urn] is None]
+                if len(todo) < len(posts):
+                    run_stats['comments_reused'] += len(posts) - len(todo)
+                if todo:
+                    fresh = dict(zip((p.urn for p in todo), await generator.generate_batch(todo)))
+                    await checkpoint.record_comments(fresh)
+                    comments.update(fresh)
+                return [comments[p.urn] for p in posts]
+
+            pipeline = FeedPipeline(
+                generate=generate_comments,
+                act=act_on_post,
+                workers=settings.PIPELINE_LLM_WORKERS,
+                queue_size=settings.PIPELINE_QUEUE_SIZE,
+                batch_fits=generator.fits
+            )
+            try:
+                processed_count = await pipeline.run(scraped_posts())
+            finally:
+                # Whatever was logged before a failure still gets written
+                with span("db_flush", run_metrics):
+                    await log_sink.flush()
+                    if near_dups:
+                        await near_dups.save()
+
+            # The run went through, so the session is known-good; the next run starts warm
+            await automator.save_session()
+
+            state['summary_parts'] = await summarizer.drain()
+            # The whole feed when it fits in one chunk, else the posts of failed partial summaries
+            state['summary_source'] = summarizer.take_pending()
+
+            run_stats['llm_calls_saved_by_prefilter'] = sum(run_stats['prefilter_skipped'].values())
+            if near_dups:
+                run_stats['near_duplicate_clusters'] = near_dups.report()
+            run_stats.update(generator.stats)
+            if generator.stats['posts_sent']:
+                run_stats['post_tokens'] = {
+                    "raw_per_post": round(generator.stats['post_tokens_raw'] / generator.stats['posts_sent'], 1),
+                    "sent_per_post": round(generator.stats['post_tokens_sent'] / generator.stats['posts_sent'], 1),
+                }
+
+            if processed_count:
+                await emit(state, {
+                    "type": "log",
+                    "message": f"Generated comments for {processed_count} posts with {generator.stats['llm_requests']} LLM requests ({generator.stats['cache_hits']} cache hits)."
+                })
+            if 'post_tokens' in run_stats:
+                await emit(state, {
+                    "type": "log",
+                    "message": f"Post text sent to the LLM: ~{run_stats['post_tokens']['sent_per_post']:.0f} tokens per post (~{run_stats['post_tokens']['raw_per_post']:.0f} as scraped)."
+                })
+
+            if automator.scroll_timings:
+                total_wait = sum(t['wait_ms'] for t in automator.scroll_timings)
+                await emit(state, {
+                    "type": "log",
+                    "message": f"Scrolled {len(automator.scroll_timings)} times, avg {total_wait / len(automator.scroll_timings):.0f}ms per scroll."
+                })
+
+            run_stats['network'] = automator.network.as_dict()
+            run_stats['pruned_posts'] = automator.pruned_posts
+            await emit(state, {
+                "type": "log",
+                "message": f"Feed loaded in {automator.network.load_ms}ms; {automator.network.bytes / 1024:.0f} KB received, {automator.network.blocked} requests blocked."
+            })
+
+            await emit(state, {"type": "stats", "stats": run_stats})
+            if checkpoint:
+                await checkpoint.feed_done(run_stats, state['summary_parts'], state['summary_source'])
+
+            if run_stats['posts_scraped'] == 0:
+                 await emit(state, {"type": "status", "message": "No posts found on the feed. Ending run."})
 
     except Exception as e:
         print(f"Error in process_feed: {e}")
+        summarizer.cancel()
         state['error'] = str(e)
-        await manager.broadcast({"type": "error", "message": str(e)})
+        await emit(state, {"type": "error", "message": str(e)})
     return state
 
 async def generate_summary(state: AgentState) -> AgentState:
     print("Node: generate_summary")
     if state.get('error'): return state
 
-    await manager.broadcast({"type": "status", "message": "Generating final summary..."})
-    all_post_content = "\n\n---\n\n".join(
-        [p['content'] for p in state['scraped_posts'] if p.get('content')]
+    await emit(state, {"type": "status", "message": "Generating final summary..."})
+    summarizer = FeedSummarizer(
+        llm,
+        get_summary_map_prompt(),
+        get_summary_reduce_prompt(),
+        chunk_tokens=settings.SUMMARY_CHUNK_TOKENS,
+        metrics=for_run(state['run_id'])
     )
-    
-    if not all_post_content:
+
+    if not state.get('summary_parts') and not state.get('summary_source'):
         state['summary'] = "No insightful posts were found to summarize."
     else:
-        summary_prompt = get_summary_system_prompt()
-        full_prompt = f"{summary_prompt}\n\n--- POSTS ---\n{all_post_content}"
         try:
-            response = await llm.ainvoke(full_prompt)
-            state['summary'] = response.content.strip()
+            if state.get('summary_parts'):
+                # Large feed: reduce the partial summaries made during process_feed
+                parts = await summarizer.collapse(state['summary_parts'])
+                content = f"--- PARTIAL SUMMARIES ---\n{POST_SEPARATOR.join(parts)}"
+                if state.get('summary_source'):
+                    content += f"\n\n--- POSTS ---\n{POST_SEPARATOR.join(state['summary_source'])}"
+                messages = [SystemMessage(get_summary_reduce_prompt()), HumanMessage(content)]
+            else:
+                # Small feed: it fits in one prompt, summarize the posts directly
+                messages = [
+                    SystemMessage(get_summary_system_prompt()),
+                    HumanMessage(f"--- POSTS ---\n{POST_SEPARATOR.join(state['summary_source'])}")
+                ]
+
+            # Stream the summary to the dashboard as it is written
+            chunks = []
+            with llm_span("summary", for_run(state['run_id'])) as llm_call:
+                async for chunk in llm.astream(messages):
+                    token = chunk.content if isinstance(chunk.content, str) else ""
+                    if token:
+                        chunks.append(token)
+                        await emit(state, {"type": "summary_chunk", "message": token})
+                state['summary'] = "".join(chunks).strip()
+                llm_call.set(tokens_in=estimate_tokens(prompt_text(messages)), tokens_out=estimate_tokens(state['summary']))
+            checkpoint = checkpoint_store.for_run(state['run_id'])
+            if checkpoint:
+                await checkpoint.finished()
         except Exception as e:
             print(f"Error generating summary: {e}")
             state['error'] = str(e)
             state['summary'] = "Error generating summary."
     
-    await manager.broadcast({"type": "summary", "message": state['summary']})
-    await manager.broadcast({"type": "status", "message": "Agent run finished."})
+    await emit(state, {"type": "summary", "message": state['summary']})
+    await emit(state, {"type": "status", "message": "Agent run finished."})
     return state
 
 def handle_error(state: AgentState) -> AgentState:
     print(f"Node: handle_error. Error: {state.get('error')}")
     return state
 
+def timed_node(name: str, node):
+    """Wraps a graph node in a timing span of its run."""
+    async def run(state: AgentState) -> AgentState:
+        with span(f"node_{name}", for_run(state.get('run_id'))):
+            result = node(state)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+    return run
+
 # --- 5. Build Graph ---
 def build_graph():
     workflow = StateGraph(AgentState)
-    workflow.add_node("setup_task", setup_task)
-    workflow.add_node("process_feed", process_feed)
-    workflow.add_node("generate_summary", generate_summary)
-    workflow.add_node("handle_error", handle_error)
+    workflow.add_node("setup_task", timed_node("setup_task", setup_task))
+    workflow.add_node("process_feed", timed_node("process_feed", process_feed))
+    workflow.add_node("generate_summary", timed_node("generate_summary", generate_summary))
+    workflow.add_node("handle_error", timed_node("handle_error", handle_error))
 
     workflow.set_entry_point("setup_task")
-    workflow.add_conditional_edges("setup_task", lambda state: "handle_error" if state.get("error") else "process_feed")
+    workflow.add_conditional_edges(
+        "setup_task",
+        lambda state: "handle_error" if state.get("error") else ("generate_summary" if state.get("feed_done") else "process_feed")
+    )
     workflow.add_conditional_edges("process_feed", lambda state: "handle_error" if state.get("error") else "generate_summary")
     workflow.add_edge("generate_summary", END)
     workflow.add_edge("handle_error", END)